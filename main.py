@@ -1,38 +1,55 @@
 # main.py
 
+import os
 import uvicorn
-from src.database import Base, engine
-from src.routes.api import app
+from sqlalchemy.orm import configure_mappers
+from src.db_init import init_schema
 from src.config.logging_config import configure_logging
 
 # Configure logging first
 logger = configure_logging()
 
 def init_db():
-    logger.info("Initializing database tables...")
-    Base.metadata.create_all(bind=engine)
-    logger.info("Database tables initialized successfully")
+    # The release phase (src/db_init.py) already creates and migrates the schema, so
+    # deployments can set SKIP_CREATE_ALL=1 to skip the per-table
+    # existence checks on every start
+    if os.getenv("SKIP_CREATE_ALL") != "1":
+        logger.info("Initializing database tables...")
+        init_schema()
+        logger.info("Database tables initialized successfully")
+    configure_mappers()
 
 def main():
     # Initialize database tables
     init_db()
-    
-    logger.info("Starting FastAPI application...")
-    # Run the FastAPI application
+
+    # Server settings (uvloop + httptools by default, reload only in dev)
+    loop = os.getenv("UVICORN_LOOP", "uvloop")
+    http = os.getenv("UVICORN_HTTP", "httptools")
+    reload = os.getenv("DEV_RELOAD", "0") == "1"
+    # One worker unless told otherwise: every worker starts its own session
+    # scheduler and keeps its own caches, so more than one needs care
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    if reload and workers > 1:
+        # uvicorn can't combine the reloader with multiple workers
+        logger.warning("DEV_RELOAD=1 ignores WEB_CONCURRENCY, running a single worker")
+        workers = 1
+    # Worker processes read this back in src/database.py to size their pools
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+
+    logger.info(f"Starting FastAPI application (loop={loop}, http={http}, reload={reload}, workers={workers})...")
+    # Run the FastAPI application; workers/reload need the import string form
     uvicorn.run(
-        app,
+        "src.routes.api:app",
         host="0.0.0.0",
-        port=8000,
-        reload=True,  # Enable auto-reload during development
+        port=int(os.getenv("PORT", "8000")),
+        loop=loop,
+        http=http,
+        reload=reload,
+        workers=workers,
         log_config=None,  # Disable uvicorn's default logging
     )
 
 if __name__ == "__main__":
     logger.info("Starting application in __main__")
-    uvicorn.run(
-        "src.routes.api:app", 
-        host="0.0.0.0", 
-        port=8000, 
-        reload=True,
-        log_config=None,  # Disable uvicorn's default logging
-    )
\ No newline at end of file
+    main()
@@ -0,0 +1,24 @@
+from sqlalchemy import create_engine, text
+from src.database import DATABASE_URL
+
+def migrate():
+    engine = create_engine(DATABASE_URL)
+    with engine.connect() as conn:
+        with conn.begin():
+            # 1. Add the generated column. Postgres fills stored generated
+            # columns by rewriting the table, so run this off-peak.
+            conn.execute(text("""
+                ALTER TABLE attempts
+                ADD COLUMN is_winner BOOLEAN
+                GENERATED ALWAYS AS (score_raw > 7000) STORED;
+            """))
+
+    # 2. Partial index over the winning rows only
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_attempts_winner
+            ON attempts(is_winner) WHERE is_winner;
+        """))
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,19 @@
+from sqlalchemy import create_engine, text
+from src.database import DATABASE_URL
+
+def migrate():
+    engine = create_engine(DATABASE_URL)
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        # 1. Composite index for the per-session scans in admin_end_session
+        conn.execute(text("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_attempts_session_score
+            ON attempts(session_id, score_raw DESC)
+            INCLUDE (is_free_attempt);
+        """))
+        # 2. Its leading column makes the single-column index redundant
+        conn.execute(text("""
+            DROP INDEX CONCURRENTLY IF EXISTS idx_attempts_session;
+        """))
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,14 @@
+from sqlalchemy import create_engine, text
+from src.database import DATABASE_URL
+
+def migrate():
+    engine = create_engine(DATABASE_URL)
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        # Winner counts per session only need the winning rows
+        conn.execute(text("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_attempts_session_winner
+            ON attempts(session_id) WHERE is_winner;
+        """))
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,27 @@
+from sqlalchemy import create_engine, text
+from src.database import DATABASE_URL
+
+def migrate():
+    engine = create_engine(DATABASE_URL)
+    # create_all() only indexes tables it creates, so the indexes declared on
+    # the models for existing tables have to be built here. The attempt
+    # indexes are built by migrate_score_to_raw and add_attempt_*_index.
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        # Session listings, newest first
+        conn.execute(text("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_sessions_start_time
+            ON sessions(start_time);
+        """))
+        # Active/expired session checks run by the scheduler every minute
+        conn.execute(text("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_sessions_status_end
+            ON sessions(status, end_time);
+        """))
+        # An attempt's conversation, in order
+        conn.execute(text("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_messages_attempt_ts
+            ON messages(attempt_id, timestamp);
+        """))
+
+if __name__ == "__main__":
+    migrate()
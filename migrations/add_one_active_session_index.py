@@ -0,0 +1,29 @@
+from sqlalchemy import create_engine, text
+from src.database import DATABASE_URL
+
+def migrate():
+    engine = create_engine(DATABASE_URL)
+    with engine.connect() as conn:
+        # 1. The index can't be built while duplicates exist. Completing them
+        # here would skip the payout and strand their pots, so stop and let
+        # an operator end each one through POST /admin/sessions/{id}/end
+        active_ids = conn.execute(text("""
+            SELECT id FROM sessions
+            WHERE status = 'active'
+            ORDER BY start_time DESC;
+        """)).scalars().all()
+    if len(active_ids) > 1:
+        raise SystemExit(
+            "More than one active session; end all but the newest before "
+            "rerunning this migration:\n" + "\n".join(str(i) for i in active_ids[1:])
+        )
+
+    # 2. Allow at most one active session
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("""
+            CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ux_sessions_one_active
+            ON sessions(status) WHERE status = 'active';
+        """))
+
+if __name__ == "__main__":
+    migrate()
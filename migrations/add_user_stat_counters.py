@@ -0,0 +1,36 @@
+from sqlalchemy import create_engine, text
+from src.database import DATABASE_URL
+
+def migrate():
+    engine = create_engine(DATABASE_URL)
+    with engine.connect() as conn:
+        with conn.begin():
+            # 1. Add the counter columns (constant defaults don't rewrite the table)
+            conn.execute(text("""
+                ALTER TABLE users
+                ADD COLUMN total_games INTEGER NOT NULL DEFAULT 0,
+                ADD COLUMN total_wins INTEGER NOT NULL DEFAULT 0,
+                ADD COLUMN total_earnings_raw BIGINT NOT NULL DEFAULT 0;
+            """))
+
+    with engine.connect() as conn:
+        with conn.begin():
+            # 2. Backfill from the existing attempts in one grouped pass
+            conn.execute(text("""
+                UPDATE users u
+                SET total_games = s.total_games,
+                    total_wins = s.total_wins,
+                    total_earnings_raw = s.total_earnings_raw
+                FROM (
+                    SELECT wldd_id,
+                           count(*) AS total_games,
+                           count(*) FILTER (WHERE score_raw > 7000) AS total_wins,
+                           coalesce(sum(earnings_raw), 0) AS total_earnings_raw
+                    FROM attempts
+                    GROUP BY wldd_id
+                ) s
+                WHERE u.wldd_id = s.wldd_id;
+            """))
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,36 @@
+from sqlalchemy import text
+
+BACKFILL_BATCH_SIZE = 10000
+
+def backfill_in_batches(engine, table, set_clause, from_clause="", where="", batch_size=BACKFILL_BATCH_SIZE):
+    """Run UPDATE {table} t SET {set_clause} over the table in primary-key batches.
+
+    from_clause and where add an UPDATE ... FROM join and its condition; the
+    updated table is aliased as t. Each batch is committed on its own so row
+    locks are only held for one batch at a time instead of for the whole table.
+    """
+    from_sql = f"FROM {from_clause}" if from_clause else ""
+    last_id = None
+    with engine.connect() as conn:
+        while True:
+            after = "WHERE id > :last_id" if last_id is not None else ""
+            upper_id = conn.execute(text(f"""
+                SELECT max(id) FROM (
+                    SELECT id FROM {table} {after} ORDER BY id LIMIT :batch_size
+                ) batch;
+            """), {"last_id": last_id, "batch_size": batch_size}).scalar()
+            if upper_id is None:
+                break
+
+            conditions = [where] if where else []
+            conditions.append("t.id <= :upper_id")
+            if last_id is not None:
+                conditions.append("t.id > :last_id")
+            conn.execute(text(f"""
+                UPDATE {table} t
+                SET {set_clause}
+                {from_sql}
+                WHERE {" AND ".join(conditions)};
+            """), {"last_id": last_id, "upper_id": upper_id})
+            conn.commit()
+            last_id = upper_id
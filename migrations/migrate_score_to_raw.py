@@ -0,0 +1,58 @@
+from sqlalchemy import create_engine, text
+from src.database import DATABASE_URL
+from migrations.backfill import backfill_in_batches
+
+def migrate():
+    engine = create_engine(DATABASE_URL)
+    with engine.connect() as conn:
+        with conn.begin():
+            # 1. Add the fixed-point score column. No default yet: a default
+            # here would fill every existing row, unscored ones included, with 0
+            conn.execute(text("""
+                ALTER TABLE attempts
+                ADD COLUMN score_raw INTEGER;
+            """))
+
+    # 2. Copy the float scores across, in batches. Unscored attempts keep
+    # score_raw NULL so score_raw IS NOT NULL still means "scored"
+    backfill_in_batches(
+        engine, "attempts",
+        "score_raw = CASE WHEN score IS NULL THEN NULL ELSE round(score * 1000) END"
+    )
+
+    with engine.connect() as conn:
+        with conn.begin():
+            # New attempts start at 0 like the old score column did
+            conn.execute(text("""
+                ALTER TABLE attempts
+                ALTER COLUMN score_raw SET DEFAULT 0;
+            """))
+
+    # The covering index on (wldd_id, created_at) INCLUDEs the score, so it
+    # has to be rebuilt around the new column
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("""
+            DROP INDEX CONCURRENTLY IF EXISTS idx_attempts_wldd;
+        """))
+
+    with engine.connect() as conn:
+        with conn.begin():
+            # 3. Drop the old float column
+            conn.execute(text("""
+                ALTER TABLE attempts
+                DROP COLUMN score;
+            """))
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        # 4. Index the new column and restore the covering index
+        conn.execute(text("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_attempts_score
+            ON attempts(score_raw);
+        """))
+        conn.execute(text("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_attempts_wldd
+            ON attempts(wldd_id, created_at) INCLUDE (score_raw, earnings_raw);
+        """))
+
+if __name__ == "__main__":
+    migrate()
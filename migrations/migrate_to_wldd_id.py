@@ -1,5 +1,6 @@
 from sqlalchemy import create_engine, text
 from src.database import DATABASE_URL
+from migrations.backfill import backfill_in_batches
 
 def migrate():
     engine = create_engine(DATABASE_URL)
@@ -7,65 +8,82 @@ def migrate():
         with conn.begin():
             # 1. Add wldd_id column to attempts
             conn.execute(text("""
-                ALTER TABLE attempts 
+                ALTER TABLE attempts
                 ADD COLUMN wldd_id VARCHAR;
             """))
-            
+
             # 2. Add wldd_id column to payments
             conn.execute(text("""
-                ALTER TABLE payments 
+                ALTER TABLE payments
                 ADD COLUMN wldd_id VARCHAR;
             """))
-            
-            # 3. Copy data from user_id to wldd_id via users table for attempts
-            conn.execute(text("""
-                UPDATE attempts a 
-                SET wldd_id = u.wldd_id 
-                FROM users u 
-                WHERE a.user_id = u.id;
-            """))
-            
-            # 4. Copy data from user_id to wldd_id via users table for payments
-            conn.execute(text("""
-                UPDATE payments p
-                SET wldd_id = u.wldd_id 
-                FROM users u 
-                WHERE p.user_id = u.id;
-            """))
-            
-            # 5. Make wldd_id not nullable in both tables
-            conn.execute(text("""
-                ALTER TABLE attempts 
-                ALTER COLUMN wldd_id SET NOT NULL;
-            """))
-            conn.execute(text("""
-                ALTER TABLE payments 
-                ALTER COLUMN wldd_id SET NOT NULL;
-            """))
-            
-            # 6. Add foreign key constraints
+
+    # Indexes for the backfill join. CREATE INDEX CONCURRENTLY can't run
+    # inside a transaction block, so use an autocommit connection.
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_attempts_user_id
+            ON attempts(user_id);
+        """))
+        conn.execute(text("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_payments_user_id
+            ON payments(user_id);
+        """))
+        conn.execute(text("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_id_wldd
+            ON users(id) INCLUDE (wldd_id);
+        """))
+
+    # 3-4. Copy data from user_id to wldd_id via users table, in batches
+    for table in ("attempts", "payments"):
+        backfill_in_batches(
+            engine, table,
+            "wldd_id = u.wldd_id",
+            from_clause="users u",
+            where="t.user_id = u.id"
+        )
+
+    # The user_id indexes go away with the column in step 7; this one only
+    # served the backfill
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("""
+            DROP INDEX CONCURRENTLY IF EXISTS idx_users_id_wldd;
+        """))
+
+    with engine.connect() as conn:
+        with conn.begin():
+            # 5-7. Make wldd_id not nullable, add the foreign key and drop the
+            # old user_id column in one ALTER per table. The constraint is
+            # added NOT VALID so the existing rows aren't scanned under the
+            # exclusive lock; they get checked by VALIDATE CONSTRAINT below.
             conn.execute(text("""
                 ALTER TABLE attempts
+                ALTER COLUMN wldd_id SET NOT NULL,
                 ADD CONSTRAINT fk_attempts_wldd_id
-                FOREIGN KEY (wldd_id)
-                REFERENCES users(wldd_id);
+                    FOREIGN KEY (wldd_id)
+                    REFERENCES users(wldd_id) NOT VALID,
+                DROP COLUMN user_id;
             """))
             conn.execute(text("""
                 ALTER TABLE payments
+                ALTER COLUMN wldd_id SET NOT NULL,
                 ADD CONSTRAINT fk_payments_wldd_id
-                FOREIGN KEY (wldd_id)
-                REFERENCES users(wldd_id);
+                    FOREIGN KEY (wldd_id)
+                    REFERENCES users(wldd_id) NOT VALID,
+                DROP COLUMN user_id;
             """))
-            
-            # 7. Drop old user_id columns
+
+    with engine.connect() as conn:
+        with conn.begin():
+            # 8. Validate the foreign keys (only takes a SHARE UPDATE EXCLUSIVE lock)
             conn.execute(text("""
                 ALTER TABLE attempts
-                DROP COLUMN user_id;
+                VALIDATE CONSTRAINT fk_attempts_wldd_id;
             """))
             conn.execute(text("""
                 ALTER TABLE payments
-                DROP COLUMN user_id;
+                VALIDATE CONSTRAINT fk_payments_wldd_id;
             """))
 
 if __name__ == "__main__":
-    migrate() 
\ No newline at end of file
+    migrate()
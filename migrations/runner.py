@@ -0,0 +1,56 @@
+from importlib import import_module
+from sqlalchemy import text
+
+# Schema changes for databases created before the models gained them, in the
+# order they have to run: the attempt migrations after migrate_score_to_raw
+# need score_raw, and add_attempt_session_winner_index needs is_winner.
+# migrate_to_wldd_id predates this list and is still run on its own.
+MIGRATIONS = [
+    "migrate_score_to_raw",
+    "add_attempt_is_winner",
+    "add_user_stat_counters",
+    "add_attempt_session_score_index",
+    "add_attempt_session_winner_index",
+    "add_lookup_indexes",
+    "add_one_active_session_index",
+]
+
+def _ensure_migrations_table(conn):
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            name VARCHAR PRIMARY KEY,
+            applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        );
+    """))
+
+def _record(conn, names):
+    for name in names:
+        conn.execute(text("INSERT INTO schema_migrations (name) VALUES (:name);"), {"name": name})
+
+def pending_migrations(engine):
+    """Names from MIGRATIONS that haven't been applied yet, in order"""
+    with engine.begin() as conn:
+        _ensure_migrations_table(conn)
+        applied = set(conn.execute(text("SELECT name FROM schema_migrations;")).scalars())
+    return [name for name in MIGRATIONS if name not in applied]
+
+def mark_all_applied(engine):
+    """Record every migration as applied, for a database create_all() just built"""
+    pending = pending_migrations(engine)
+    with engine.begin() as conn:
+        _record(conn, pending)
+
+def run_pending(engine, echo=print):
+    """Apply the pending migrations in order, recording each one as it finishes"""
+    pending = pending_migrations(engine)
+    if pending and engine.dialect.name != "postgresql":
+        raise SystemExit(
+            "Pending migrations only run on Postgres; recreate this "
+            f"{engine.dialect.name} database instead: " + ", ".join(pending)
+        )
+    for name in pending:
+        echo(f"Applying {name}...")
+        import_module(f"migrations.{name}").migrate()
+        with engine.begin() as conn:
+            _record(conn, [name])
+    return pending
@@ -2,29 +2,46 @@
 
 import sys
 import os
+import re
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
-from sqlalchemy.orm import Session
-from uuid import UUID
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, joinedload, selectinload, sessionmaker
 from tabulate import tabulate  # We'll use this for nice table formatting
 
 # Add the parent directory to the Python path so we can import our modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
-from src.database import SessionLocal
+from src.database import engine
 from src.models.game import SessionStatus
-from src.models.database_models import DBSession, DBAttempt, DBMessage, DBUser
+from src.models.database_models import DBSession, DBAttempt, DBMessage, DBUser, _to_usdc
 
 UTC = ZoneInfo("UTC")
 
+# The CLI keeps using objects after their commit (create_session returns its
+# DBSession after the session closes), so skip the re-SELECT expiry would cost.
+# The API's SessionLocal keeps the default so bulk UPDATEs can't leave stale rows.
+CLISessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+# The GUID column type binds strings directly, so IDs from the command line
+# only need a shape check instead of a round trip through uuid.UUID
+UUID_PATTERN = re.compile(r"^[0-9a-fA-F]{8}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{12}$")
+
+def format_table(rows, headers) -> str:
+    """Render rows as a plain table in one pass (much cheaper than tabulate's grid for long listings)"""
+    cells = [list(headers)] + [["" if c is None else str(c) for c in row] for row in rows]
+    widths = [max(len(c) for c in column) for column in zip(*cells)]
+    lines = ["| " + " | ".join(c.ljust(w) for c, w in zip(row, widths)) + " |" for row in cells]
+    separator = "+-" + "-+-".join("-" * w for w in widths) + "-+"
+    return "\n".join([separator, lines[0], separator, *lines[1:], separator])
+
 def create_session(entry_fee: float = 10.0, duration_hours: int = 1) -> DBSession:
     """Create a new active session"""
-    db = SessionLocal()
-    try:
+    with CLISessionLocal() as db:
         # Check for existing active session
-        active_session = db.query(DBSession).filter(
-            DBSession.status == SessionStatus.ACTIVE.value
-        ).first()
+        active_session = db.execute(
+            select(DBSession).where(DBSession.status == SessionStatus.ACTIVE.value)
+        ).scalars().first()
         
         if active_session:
             print("Error: An active session already exists!")
@@ -55,19 +72,17 @@ def create_session(entry_fee: float = 10.0, duration_hours: int = 1) -> DBSessio
         print(f"End Time: {end_time}")
         
         return new_session
-        
-    finally:
-        db.close()
 
 def end_session(session_id: str = None) -> None:
     """End the active session or a specific session by ID"""
-    db = SessionLocal()
-    try:
-        query = db.query(DBSession)
+    with CLISessionLocal() as db:
+        query = select(DBSession)
         if session_id:
-            session = query.filter(DBSession.id == session_id).first()
+            session = db.execute(query.where(DBSession.id == session_id)).scalars().first()
         else:
-            session = query.filter(DBSession.status == SessionStatus.ACTIVE.value).first()
+            session = db.execute(
+                query.where(DBSession.status == SessionStatus.ACTIVE.value)
+            ).scalars().first()
         
         if not session:
             print("No active session found!")
@@ -79,23 +94,31 @@ def end_session(session_id: str = None) -> None:
         print(f"Successfully ended session {session.id}")
         print(f"Final pot: {session.total_pot} WLDD")
         
-        # Show winners if any
-        winners = [attempt for attempt in session.attempts if attempt.score > 7.0]
+        # Show winners if any (served by idx_attempts_session_winner)
+        winners = db.execute(
+            select(DBAttempt.wldd_id, DBAttempt.score)
+            .where(DBAttempt.session_id == session.id, DBAttempt.is_winner)
+        ).all()
         if winners:
             print("\nWinning attempts:")
-            for attempt in winners:
-                print(f"User {attempt.user_id}: Score {attempt.score}")
+            for wldd_id, score in winners:
+                print(f"User {wldd_id}: Score {score}")
         else:
             print("\nNo winning attempts in this session")
-            
-    finally:
-        db.close()
 
 def show_session_details(session_id: str) -> None:
     """Show detailed information about a specific session"""
-    db = SessionLocal()
-    try:
-        session = db.query(DBSession).filter(DBSession.id == UUID(session_id)).first()
+    if not UUID_PATTERN.match(session_id):
+        print(f"Invalid session ID: {session_id}")
+        return
+
+    with CLISessionLocal() as db, db.begin():
+        session = db.execute(
+            select(DBSession).options(
+                selectinload(DBSession.attempts).joinedload(DBAttempt.user),
+                selectinload(DBSession.attempts).selectinload(DBAttempt.messages)
+            ).where(DBSession.id == session_id)
+        ).scalars().first()
         if not session:
             print(f"No session found with ID: {session_id}")
             return
@@ -116,14 +139,14 @@ def show_session_details(session_id: str) -> None:
         # Prepare attempt data for tabulation
         attempt_data = []
         for attempt in session.attempts:
-            user = db.query(DBUser).filter(DBUser.wldd_id == attempt.wldd_id).first()
+            user = attempt.user
             attempt_data.append([
                 str(attempt.id),  # Full UUID
                 user.wldd_id if user else "Unknown",
                 attempt.score or "Not scored",
                 len(attempt.messages),
                 attempt.messages_remaining,
-                "✓" if attempt.score and attempt.score > 7.0 else "✗"
+                "✓" if attempt.is_winner else "✗"
             ])
 
         print("\nAttempts:")
@@ -134,19 +157,26 @@ def show_session_details(session_id: str) -> None:
             maxcolwidths=[None, 20, 10, 10, 10, 8]  # Allow ID column to be full width
         ))
 
-    finally:
-        db.close()
-
 def show_attempt_details(attempt_id: str) -> None:
     """Show detailed information about a specific attempt"""
-    db = SessionLocal()
-    try:
-        attempt = db.query(DBAttempt).filter(DBAttempt.id == UUID(attempt_id)).first()
+    if not UUID_PATTERN.match(attempt_id):
+        print(f"Invalid attempt ID: {attempt_id}")
+        return
+
+    with CLISessionLocal() as db, db.begin():
+        attempt = db.execute(
+            select(DBAttempt)
+            .options(
+                selectinload(DBAttempt.messages),
+                joinedload(DBAttempt.user)
+            )
+            .where(DBAttempt.id == attempt_id)
+        ).scalars().first()
         if not attempt:
             print(f"No attempt found with ID: {attempt_id}")
             return
 
-        user = db.query(DBUser).filter(DBUser.wldd_id == attempt.wldd_id).first()
+        user = attempt.user
         
         print("\nAttempt Details:")
         print("-" * 50)
@@ -155,7 +185,7 @@ def show_attempt_details(attempt_id: str) -> None:
         print(f"Score: {attempt.score or 'Not scored'}")
         print(f"Messages Used: {len(attempt.messages)}")
         print(f"Messages Remaining: {attempt.messages_remaining}")
-        print(f"Winner: {'Yes' if attempt.score and attempt.score > 7.0 else 'No'}")
+        print(f"Winner: {'Yes' if attempt.is_winner else 'No'}")
 
         if attempt.messages:
             print("\nConversation:")
@@ -165,14 +195,12 @@ def show_attempt_details(attempt_id: str) -> None:
                 print(f"User: {msg.content}")
                 print(f"AI: {msg.ai_response}")
 
-    finally:
-        db.close()
-
 def show_user_stats(wldd_id: str) -> None:
     """Show detailed statistics for a user"""
-    db = SessionLocal()
-    try:
-        user = db.query(DBUser).filter(DBUser.wldd_id == wldd_id).first()
+    with CLISessionLocal() as db, db.begin():
+        user = db.execute(
+            select(DBUser).where(DBUser.wldd_id == wldd_id)
+        ).scalars().first()
         if not user:
             print("User not found!")
             return
@@ -183,11 +211,20 @@ def show_user_stats(wldd_id: str) -> None:
         print(f"Created: {user.created_at}")
         print(f"Last Active: {user.last_active}")
 
-        # Get user statistics
-        total_attempts = len(user.attempts)
-        winning_attempts = len([a for a in user.attempts if a.score and a.score > 7.0])
-        total_messages = sum(len(a.messages) for a in user.attempts)
-        total_earnings = sum(a.earnings for a in user.attempts if a.earnings)
+        # Get user statistics (aggregated in SQL)
+        total_attempts, winning_attempts, total_earnings_raw = db.execute(
+            select(
+                func.count(DBAttempt.id),
+                func.count(DBAttempt.id).filter(DBAttempt.is_winner),
+                func.coalesce(func.sum(DBAttempt.earnings_raw), 0)
+            ).where(DBAttempt.wldd_id == user.wldd_id)
+        ).one()
+        total_messages = db.execute(
+            select(func.count(DBMessage.id)).join(DBMessage.attempt).where(
+                DBAttempt.wldd_id == user.wldd_id
+            )
+        ).scalar()
+        total_earnings = _to_usdc(total_earnings_raw)
         
         print("\nStatistics:")
         print(f"Total Attempts: {total_attempts}")
@@ -197,11 +234,20 @@ def show_user_stats(wldd_id: str) -> None:
         print(f"Total Earnings: {total_earnings} WLDD")
 
         # Show recent attempts
-        if user.attempts:
+        recent_attempts = db.execute(
+            select(DBAttempt).options(
+                joinedload(DBAttempt.session),
+                selectinload(DBAttempt.messages)
+            ).where(
+                DBAttempt.wldd_id == user.wldd_id
+            ).order_by(DBAttempt.created_at.desc()).limit(5)
+        ).scalars().all()
+
+        if recent_attempts:
             print("\nRecent Attempts:")
             attempt_data = []
-            for attempt in sorted(user.attempts, key=lambda x: x.created_at, reverse=True)[:5]:
-                session = db.query(DBSession).filter(DBSession.id == attempt.session_id).first()
+            for attempt in recent_attempts:
+                session = attempt.session
                 attempt_data.append([
                     str(attempt.id),
                     session.start_time.strftime("%Y-%m-%d %H:%M") if session else "Unknown",
@@ -216,39 +262,53 @@ def show_user_stats(wldd_id: str) -> None:
                 tablefmt="grid"
             ))
 
-    finally:
-        db.close()
+def list_sessions(show_attempts: bool = False, limit: int = 50, offset: int = 0, pretty: bool = False) -> None:
+    """List sessions (newest first, one page at a time) and their status"""
+    with CLISessionLocal() as db, db.begin():
+        # One grouped query for sessions plus their attempt/winner counts
+        rows = db.execute(
+            select(
+                DBSession.id,
+                DBSession.status,
+                DBSession.start_time,
+                DBSession.end_time,
+                DBSession.entry_fee,
+                DBSession.total_pot,
+                func.count(DBAttempt.id),
+                func.count(DBAttempt.id).filter(DBAttempt.is_winner)
+            )
+            .outerjoin(DBSession.attempts)
+            .group_by(DBSession.id)
+            .order_by(DBSession.start_time.desc())
+            .limit(limit)
+            .offset(offset)
+        ).all()
 
-def list_sessions(show_attempts: bool = False) -> None:
-    """List all sessions and their status"""
-    db = SessionLocal()
-    try:
-        sessions = db.query(DBSession).order_by(DBSession.start_time.desc()).all()
-        
-        session_data = []
-        for session in sessions:
-            winners = len([a for a in session.attempts if a.score and a.score > 7.0])
-            session_data.append([
-                str(session.id),  # Full UUID
-                session.status,
-                session.start_time.strftime("%Y-%m-%d %H:%M"),  # Format datetime as string
-                session.end_time.strftime("%Y-%m-%d %H:%M"),    # Format datetime as string
-                session.entry_fee,
-                session.total_pot,
-                len(session.attempts),
+        session_data = [
+            [
+                str(session_id),  # Full UUID
+                status,
+                start_time.strftime("%Y-%m-%d %H:%M"),  # Format datetime as string
+                end_time.strftime("%Y-%m-%d %H:%M"),    # Format datetime as string
+                entry_fee,
+                total_pot,
+                attempt_count,
                 winners
-            ])
+            ]
+            for session_id, status, start_time, end_time, entry_fee, total_pot, attempt_count, winners in rows
+        ]
 
-        print("\nAll Sessions:")
-        print(tabulate(
-            session_data,
-            headers=["ID", "Status", "Start", "End", "Fee", "Pot", "Attempts", "Winners"],
-            tablefmt="grid",
-            maxcolwidths=[None, 15, 25, 25, 8, 10, 10, 10]
-        ))
-            
-    finally:
-        db.close()
+        headers = ["ID", "Status", "Start", "End", "Fee", "Pot", "Attempts", "Winners"]
+        print(f"\nSessions {offset + 1}-{offset + len(session_data)}:")
+        if pretty:
+            print(tabulate(
+                session_data,
+                headers=headers,
+                tablefmt="grid",
+                maxcolwidths=[None, 15, 25, 25, 8, 10, 10, 10]
+            ))
+        else:
+            print(format_table(session_data, headers))
 
 if __name__ == "__main__":
     import argparse
@@ -263,6 +323,9 @@ if __name__ == "__main__":
     parser.add_argument("--fee", type=float, default=10.0, help="Entry fee for new session")
     parser.add_argument("--duration", type=int, default=1, help="Session duration in hours")
     parser.add_argument("--session-id", help="Session ID for specific operations")
+    parser.add_argument("--limit", type=int, default=50, help="Number of sessions to list")
+    parser.add_argument("--offset", type=int, default=0, help="Number of sessions to skip when listing")
+    parser.add_argument("--pretty", action="store_true", help="Render the session list with tabulate's grid format")
     
     # Attempt and user arguments
     parser.add_argument("--attempt-id", help="Attempt ID for detailed view")
@@ -275,7 +338,7 @@ if __name__ == "__main__":
     elif args.action == "end":
         end_session(args.session_id)
     elif args.action == "list":
-        list_sessions()
+        list_sessions(limit=args.limit, offset=args.offset, pretty=args.pretty)
     elif args.action == "show-session":
         if not args.session_id:
             print("Error: --session-id is required for show-session")
@@ -3,34 +3,48 @@ import sys
 from logging.config import dictConfig
 import os
 
+_CONFIGURED = False
+
 def setup_logging():
-    """Configure logging for the application"""
+    """Configure logging for the application (only the first call has an effect)"""
+    global _CONFIGURED
+    if _CONFIGURED:
+        return logging.getLogger("bungo")
+
     log_level = os.getenv("LOG_LEVEL", "INFO").upper()
-    
-    # Create our formatters
-    detailed_formatter = logging.Formatter(
-        '[%(asctime)s] %(levelname)s [%(name)s.%(funcName)s:%(lineno)d] %(message)s'
-    )
-    
-    # Create and configure the console handler
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setFormatter(detailed_formatter)
-    
-    # Configure the root logger
-    root_logger = logging.getLogger()
-    root_logger.setLevel(log_level)
-    root_logger.addHandler(console_handler)
-    
-    # Configure specific loggers
-    loggers = {
-        "bungo": log_level,
-        "bungo.llm": "DEBUG",  # Always debug for LLM calls
-        "uvicorn": log_level,
-        "uvicorn.access": log_level,
-    }
-    
-    for logger_name, level in loggers.items():
-        logger = logging.getLogger(logger_name)
-        logger.setLevel(level)
-        
+
+    # dictConfig replaces the root handlers instead of appending to them, so
+    # the console handler is never installed twice
+    dictConfig({
+        "version": 1,
+        "disable_existing_loggers": False,
+        "formatters": {
+            "detailed": {
+                "format": "[%(asctime)s] %(levelname)s [%(name)s.%(funcName)s:%(lineno)d] %(message)s",
+            },
+        },
+        "handlers": {
+            "console": {
+                "class": "logging.StreamHandler",
+                "stream": sys.stdout,
+                "formatter": "detailed",
+            },
+        },
+        "root": {
+            "level": log_level,
+            "handlers": ["console"],
+        },
+        # Configure specific loggers
+        "loggers": {
+            "bungo": {"level": log_level},
+            "bungo.llm": {"level": "DEBUG"},  # Always debug for LLM calls
+            "uvicorn": {"level": log_level},
+            "uvicorn.access": {"level": log_level},
+        },
+    })
+
+    _CONFIGURED = True
     return logging.getLogger("bungo")
+
+# main.py imports it under this name
+configure_logging = setup_logging
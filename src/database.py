@@ -1,7 +1,7 @@
 # src/database.py
 
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from src.services.llm_service import LLMService
@@ -14,19 +14,57 @@ DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./game.db")
 if DATABASE_URL.startswith("postgres://"):
     DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
 
-# Create engine with appropriate settings
-if DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(
-        DATABASE_URL, 
-        connect_args={"check_same_thread": False}
-    )
-else:
-    engine = create_engine(
+def _tune_sqlite_connection(dbapi_connection, connection_record):
+    # WAL lets readers run alongside a writer and, with synchronous=NORMAL,
+    # avoids an fsync on every commit; the rest trades memory for fewer page reads
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA cache_size=-65536")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.close()
+
+@lru_cache(maxsize=1)
+def get_engine():
+    """Create the process-wide engine with settings for the configured database"""
+    if DATABASE_URL.startswith("sqlite"):
+        sqlite_engine = create_engine(
+            DATABASE_URL, 
+            connect_args={"check_same_thread": False}
+        )
+        event.listen(sqlite_engine, "connect", _tune_sqlite_connection)
+        return sqlite_engine
+
+    # Split the connection budget across worker processes; with no overflow,
+    # DB_POOL_TOTAL is the ceiling on connections across all --workers
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    pool_size = max(2, int(os.getenv("DB_POOL_TOTAL", "20")) // workers)
+    return create_engine(
         DATABASE_URL,
-        pool_size=20,
-        max_overflow=0
+        pool_size=pool_size,
+        max_overflow=0,
+        pool_pre_ping=True,
+        pool_recycle=1800,
+        # Fail fast when the pool is exhausted instead of queueing requests
+        # behind SQLAlchemy's 30s default
+        pool_timeout=int(os.getenv("DB_POOL_TIMEOUT", "10")),
+        # INSERTs are already batched into multi-row VALUES; this also sends
+        # executemany UPDATEs/DELETEs (e.g. a flush of rescored attempts)
+        # in pages via psycopg2's execute_batch instead of one per row
+        executemany_mode="values_plus_batch"
     )
 
+engine = get_engine()
+
+def _dispose_inherited_pool():
+    # A forked worker (e.g. gunicorn) must not reuse the parent's pooled
+    # connections; drop them without closing the parent's sockets
+    get_engine().dispose(close=False)
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_dispose_inherited_pool)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -1,11 +1,23 @@
 # src/db_init.py
+from sqlalchemy import inspect
 from src.database import engine, Base
 from src.models.database_models import DBSession, DBAttempt, DBMessage, DBUser  # Add DBUser
+from migrations.runner import mark_all_applied, run_pending
+
+def init_schema():
+    """Create missing tables; a brand-new database gets every migration recorded as applied"""
+    fresh = not inspect(engine).has_table("attempts")
+    Base.metadata.create_all(bind=engine)  # This will only create tables that don't exist
+    if fresh:
+        # create_all() already built the columns and indexes the migrations add
+        mark_all_applied(engine)
 
 def init_db():
     print("Initializing database...")
-    Base.metadata.create_all(bind=engine)  # This will only create tables that don't exist
+    init_schema()
+    # Existing tables only get new columns and indexes from the migrations
+    run_pending(engine)
     print("Database initialization complete")
 
 if __name__ == "__main__":
-    init_db()
\ No newline at end of file
+    init_db()
@@ -1,5 +1,6 @@
 import click
 from src.database import Base, engine
+from src.db_init import init_schema
 from src.models.database_models import DBSession, DBUser, DBAttempt, DBMessage
 
 @click.group()
@@ -10,7 +11,7 @@ def cli():
 def init_db():
     """Initialize the database schema"""
     click.echo("Creating database tables...")
-    Base.metadata.create_all(engine)
+    init_schema()
     click.echo("Done!")
 
 @cli.command()
@@ -20,7 +21,7 @@ def reset_db():
         click.echo("Dropping all tables...")
         Base.metadata.drop_all(engine)
         click.echo("Creating new tables...")
-        Base.metadata.create_all(engine)
+        init_schema()
         click.echo("Done!")
 
 @cli.command()
@@ -32,5 +33,12 @@ def migrate_to_wldd():
         migrate()
         click.echo("Migration complete!")
 
+@cli.command()
+def migrate():
+    """Apply the pending schema migrations in dependency order"""
+    from migrations.runner import run_pending
+    applied = run_pending(engine, echo=click.echo)
+    click.echo(f"Applied {len(applied)} migration(s)" if applied else "Schema is up to date")
+
 if __name__ == '__main__':
     cli() 
\ No newline at end of file
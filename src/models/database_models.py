@@ -1,64 +1,80 @@
 # src/models/database_models.py
-from sqlalchemy import Column, ForeignKey, String, Float, Boolean, DateTime, Integer, Index, BigInteger
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, ForeignKey, String, Float, Boolean, DateTime, Integer, Index, BigInteger, select, func, cast, event, update, inspect, Computed, text
+from sqlalchemy.orm import relationship, Session, object_session, column_property
+from sqlalchemy.ext.hybrid import hybrid_property
 from src.database import Base
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.types import TypeDecorator, CHAR
+from sqlalchemy.types import TypeDecorator, BINARY
 import uuid
 from uuid import uuid4
 from zoneinfo import ZoneInfo
 from datetime import datetime
 
 UTC = ZoneInfo("UTC")
+_UTC = UTC
+_UUID = uuid.UUID
+
+# Money columns store micro-units of USDC/WLD
+_USDC_SCALE = 1_000_000
+_CENT = _USDC_SCALE // 100
+
+def _to_usdc(raw):
+    """Convert micro-units to USDC/WLD, rounded half-up to the cent"""
+    return (raw + _CENT // 2) // _CENT / 100
+
+def _to_usdc_sql(raw):
+    """SQL twin of _to_usdc, so selected hybrids match the Python values"""
+    return cast((raw + _CENT // 2) // _CENT, Float) / 100
 
 class UTCDateTime(TypeDecorator):
     impl = DateTime
     cache_ok = True
 
     def process_bind_param(self, value, dialect):
-        if value is not None:
-            if value.tzinfo is None:
-                value = value.replace(tzinfo=UTC)
-            return value.astimezone(UTC)
-        return value
+        if value is None:
+            return value
+        tz = value.tzinfo
+        # ZoneInfo("UTC") is cached, so values built with datetime.now(UTC)
+        # anywhere in the app skip the astimezone() copy
+        if tz is _UTC:
+            return value
+        if tz is None:
+            return value.replace(tzinfo=_UTC)
+        return value.astimezone(_UTC)
 
     def process_result_value(self, value, dialect):
-        if value is not None:
-            return value.replace(tzinfo=UTC)
-        return value
+        return value.replace(tzinfo=_UTC) if value is not None else value
 
 class GUID(TypeDecorator):
     """Platform-independent GUID type.
     Uses PostgreSQL's UUID type, otherwise uses
-    CHAR(32), storing as stringified hex values.
+    BINARY(16), storing the raw 16 bytes.
     """
-    impl = CHAR
+    impl = BINARY
     cache_ok = True
 
     def load_dialect_impl(self, dialect):
         if dialect.name == 'postgresql':
-            return dialect.type_descriptor(UUID())
+            return dialect.type_descriptor(UUID(as_uuid=True))
         else:
-            return dialect.type_descriptor(CHAR(32))
+            return dialect.type_descriptor(BINARY(16))
 
     def process_bind_param(self, value, dialect):
-        if value is None:
+        if value is None or dialect.name == 'postgresql':
+            # psycopg2 adapts uuid.UUID natively
             return value
-        elif dialect.name == 'postgresql':
-            return str(value)
         else:
             if not isinstance(value, uuid.UUID):
-                return "%.32x" % uuid.UUID(value).int
+                return uuid.UUID(value).bytes
             else:
-                return "%.32x" % value.int
+                return value.bytes
 
     def process_result_value(self, value, dialect):
-        if value is None:
-            return value
-        else:
-            if not isinstance(value, uuid.UUID):
-                value = uuid.UUID(value)
+        # Runs once per GUID column per row: Postgres already hands back
+        # UUID objects, SQLite hands back the raw 16 bytes
+        if value is None or value.__class__ is _UUID:
             return value
+        return _UUID(bytes=value)
 
 class DBSession(Base):
     __tablename__ = "sessions"
@@ -69,48 +85,87 @@ class DBSession(Base):
     entry_fee_raw = Column(BigInteger)  # Store fee in smallest unit
     total_pot_raw = Column(BigInteger, default=0)  # Change this from Float
     status = Column(String, nullable=False)
-    winning_attempt_id = Column(UUID(as_uuid=True), ForeignKey('attempts.id'), nullable=True)
+    winning_attempt_id = Column(GUID(), ForeignKey('attempts.id'), nullable=True)
 
+    # Collections never lazy load; queries that need them must ask for
+    # them with selectinload()/joinedload()
     attempts = relationship("DBAttempt", 
                           back_populates="session",
-                          foreign_keys="[DBAttempt.session_id]")
+                          foreign_keys="[DBAttempt.session_id]",
+                          lazy="raise_on_sql")
     winning_attempt = relationship("DBAttempt", 
                                  foreign_keys=[winning_attempt_id])
 
-    @property
+    __table_args__ = (
+        Index('idx_sessions_start_time', 'start_time'),
+        Index('idx_sessions_status_end', 'status', 'end_time'),
+        # At most one active session, enforced by the database
+        Index('ux_sessions_one_active', 'status', unique=True,
+              postgresql_where=text("status = 'active'"),
+              sqlite_where=text("status = 'active'")),
+    )
+
+    @hybrid_property
     def entry_fee(self):
         """Get entry fee in USDC/WLD units"""
-        return round(float(self.entry_fee_raw) * 10**-6, 2) if self.entry_fee_raw is not None else None
+        return _to_usdc(self.entry_fee_raw) if self.entry_fee_raw is not None else None
         
     @entry_fee.setter
     def entry_fee(self, value):
         """Set entry fee from USDC/WLD units"""
         if value is not None:
-            self.entry_fee_raw = int(value * 10**6)
+            self.entry_fee_raw = int(value * _USDC_SCALE)
         else:
             self.entry_fee_raw = None
 
-    @property
+    @entry_fee.expression
+    def entry_fee(cls):
+        """Entry fee in USDC/WLD units, computed in SQL"""
+        return _to_usdc_sql(cls.entry_fee_raw)
+
+    @hybrid_property
     def total_pot(self):
         """Get total pot in USDC/WLD units"""
-        return round(float(self.total_pot_raw) * 10**-6, 2) if self.total_pot_raw is not None else None
+        return _to_usdc(self.total_pot_raw) if self.total_pot_raw is not None else None
         
     @total_pot.setter
     def total_pot(self, value):
         """Set total pot from USDC/WLD units"""
         if value is not None:
-            self.total_pot_raw = int(value * 10**6)
+            self.total_pot_raw = int(value * _USDC_SCALE)
         else:
             self.total_pot_raw = None
 
+    @total_pot.expression
+    def total_pot(cls):
+        """Total pot in USDC/WLD units, computed in SQL"""
+        return _to_usdc_sql(cls.total_pot_raw)
+
+    @classmethod
+    def add_entry_fee_to_pot(cls, session: Session, session_id) -> int:
+        """Atomically add a session's entry fee to its pot.
+
+        Returns the new pot in micro-units. Concurrent entries can't lose an
+        increment the way a read-modify-write of total_pot can.
+        """
+        return session.execute(
+            update(cls)
+            .where(cls.id == session_id)
+            .values(total_pot_raw=cls.total_pot_raw + cls.entry_fee_raw)
+            .returning(cls.total_pot_raw)
+        ).scalar_one()
+
 class DBAttempt(Base):
     __tablename__ = "attempts"
 
     id = Column(GUID(), primary_key=True, default=uuid4)
-    wldd_id = Column(String, ForeignKey("users.wldd_id"))
+    # active_history loads the previous owner when an expired attempt is
+    # reassigned, so the counter listener can recount them too
+    wldd_id = column_property(Column(String, ForeignKey("users.wldd_id")), active_history=True)
     session_id = Column(GUID(), ForeignKey("sessions.id"))
     earnings_raw = Column(BigInteger, default=0)  # Store earnings in smallest unit
-    score = Column(Float, default=0.0)
+    score_raw = Column(Integer, default=0)  # Store score x1000 (fixed point)
+    is_winner = Column(Boolean, Computed("score_raw > 7000", persisted=True))
     messages_remaining = Column(Integer, default=5)
     created_at = Column(UTCDateTime, nullable=False, default=lambda: datetime.now(UTC))
     paid = Column(Boolean, default=False)
@@ -120,22 +175,76 @@ class DBAttempt(Base):
     session = relationship("DBSession", 
                          back_populates="attempts",
                          foreign_keys=[session_id])
-    messages = relationship("DBMessage", back_populates="attempt")
+    messages = relationship("DBMessage", back_populates="attempt", lazy="raise_on_sql")
     user = relationship("DBUser", back_populates="attempts")
 
-    @property
+    __table_args__ = (
+        # Session lookups plus the settle/winner scans, which read scores
+        # best-first and split paid from free; supersedes (session_id) alone
+        Index('idx_attempts_session_score', session_id, score_raw.desc(),
+              postgresql_include=['is_free_attempt']),
+        # Covers per-user history reads (score/earnings) on Postgres
+        Index('idx_attempts_wldd', 'wldd_id', 'created_at',
+              postgresql_include=['score_raw', 'earnings_raw']),
+        Index('idx_attempts_score', 'score_raw'),
+        # Partial index: only winning rows are stored
+        Index('idx_attempts_winner', 'is_winner', postgresql_where=text('is_winner')),
+        # Per-session winner counts and lookups touch only the winning rows
+        Index('idx_attempts_session_winner', 'session_id', postgresql_where=text('is_winner')),
+    )
+
+    @hybrid_property
+    def score(self):
+        """Get score on the judge's 0-10 scale"""
+        return self.score_raw / 1000 if self.score_raw is not None else None
+
+    @score.setter
+    def score(self, value):
+        """Set score from the judge's 0-10 scale"""
+        if value is not None:
+            self.score_raw = round(value * 1000)
+        else:
+            self.score_raw = None
+
+    @score.expression
+    def score(cls):
+        """Score on the 0-10 scale, computed in SQL (filter on score_raw to use the index)"""
+        return cast(cls.score_raw, Float) / 1000
+
+    @hybrid_property
     def earnings(self):
         """Get earnings in USDC/WLD units"""
-        return round(float(self.earnings_raw) * 10**-6, 2) if self.earnings_raw is not None else None
+        return _to_usdc(self.earnings_raw) if self.earnings_raw is not None else None
         
     @earnings.setter
     def earnings(self, value):
         """Set earnings from USDC/WLD units"""
         if value is not None:
-            self.earnings_raw = int(value * 10**6)
+            self.earnings_raw = int(value * _USDC_SCALE)
         else:
             self.earnings_raw = None
 
+    @earnings.expression
+    def earnings(cls):
+        """Earnings in USDC/WLD units, computed in SQL"""
+        return _to_usdc_sql(cls.earnings_raw)
+
+    @classmethod
+    def try_use_message(cls, session: Session, attempt_id, cost: float = 0.0) -> bool:
+        """Atomically take one of an attempt's remaining messages and add its cost.
+
+        Returns False if the attempt has none left.
+        """
+        result = session.execute(
+            update(cls)
+            .where(cls.id == attempt_id, cls.messages_remaining > 0)
+            .values(
+                messages_remaining=cls.messages_remaining - 1,
+                cost_to_run=cls.cost_to_run + cost,
+            )
+        )
+        return result.rowcount == 1
+
 class DBMessage(Base):
     __tablename__ = "messages"
     
@@ -147,6 +256,10 @@ class DBMessage(Base):
 
     attempt = relationship("DBAttempt", back_populates="messages")
 
+    __table_args__ = (
+        Index('idx_messages_attempt_ts', 'attempt_id', 'timestamp'),
+    )
+
 class DBUser(Base):
     __tablename__ = "users"
     
@@ -157,22 +270,115 @@ class DBUser(Base):
     last_active = Column(DateTime(timezone=True), nullable=False)
     language = Column(String, nullable=False, default="english")
     used_free_attempt = Column(Boolean, default=False)
+    # Denormalized attempt stats, kept current by the DBAttempt listeners below
+    total_games = Column(Integer, nullable=False, default=0)
+    total_wins = Column(Integer, nullable=False, default=0)
+    total_earnings_raw = Column(BigInteger, nullable=False, default=0)
     
     # Relationships
     attempts = relationship("DBAttempt", back_populates="user")
     payments = relationship("DBPayment", back_populates="user")
     
-    def get_stats(self):
-        return {
-            "total_games": len(self.attempts),
-            "total_wins": len([a for a in self.attempts if a.score > 7.0]),
-            "total_earnings": sum(a.earnings for a in self.attempts if a.earnings)
+    @hybrid_property
+    def total_earnings(self):
+        """Lifetime earnings in USDC/WLD units"""
+        return _to_usdc(self.total_earnings_raw or 0)
+
+    @total_earnings.expression
+    def total_earnings(cls):
+        """Lifetime earnings in USDC/WLD units, computed in SQL"""
+        return _to_usdc_sql(cls.total_earnings_raw)
+
+    def get_stats(self, session: Session):
+        return DBUser.get_stats_bulk(session, [self.wldd_id])[self.wldd_id]
+
+    @classmethod
+    def get_stats_bulk(cls, session: Session, wldd_ids):
+        """Stats for many users, read from the counter columns in one query"""
+        stats = {
+            wldd_id: {"total_games": 0, "total_wins": 0, "total_earnings": 0.0}
+            for wldd_id in wldd_ids
         }
+        if not stats:
+            return stats
+        # Read the columns rather than the instance attributes, which can be
+        # stale after attempt writes in the same session
+        rows = session.execute(
+            select(
+                cls.wldd_id,
+                cls.total_games,
+                cls.total_wins,
+                cls.total_earnings_raw,
+            ).where(cls.wldd_id.in_(stats))
+        )
+        for wldd_id, total_games, total_wins, earnings_raw in rows:
+            stats[wldd_id] = {
+                "total_games": total_games,
+                "total_wins": total_wins,
+                "total_earnings": _to_usdc(earnings_raw)
+            }
+        return stats
+
+    @classmethod
+    def recount_stats(cls, connection, wldd_ids):
+        """Rebuild the stat counters of the given users from their attempts.
+
+        Bulk UPDATEs on attempts skip the ORM listeners below and must call
+        this for the users they touch. wldd_ids may be a list or a SELECT.
+        """
+        user_attempts = DBAttempt.wldd_id == cls.wldd_id
+        connection.execute(
+            update(cls).where(cls.wldd_id.in_(wldd_ids)).values(
+                total_games=select(func.count(DBAttempt.id))
+                    .where(user_attempts).scalar_subquery(),
+                total_wins=select(func.count(DBAttempt.id))
+                    .where(user_attempts, DBAttempt.is_winner).scalar_subquery(),
+                total_earnings_raw=select(func.coalesce(func.sum(DBAttempt.earnings_raw), 0))
+                    .where(user_attempts).scalar_subquery(),
+            )
+        )
+
+def _mark_stats_stale(target, *wldd_ids):
+    """Queue users for one counter recount when the current flush ends"""
+    stale = object_session(target).info.setdefault("stale_user_stats", set())
+    stale.update(wldd_id for wldd_id in wldd_ids if wldd_id is not None)
+
+@event.listens_for(DBAttempt, "after_insert")
+def _count_new_attempt(mapper, connection, target):
+    won = target.score_raw is not None and target.score_raw > 7000
+    connection.execute(
+        update(DBUser).where(DBUser.wldd_id == target.wldd_id).values(
+            total_games=DBUser.total_games + 1,
+            total_wins=DBUser.total_wins + (1 if won else 0),
+            total_earnings_raw=DBUser.total_earnings_raw + (target.earnings_raw or 0),
+        )
+    )
+
+@event.listens_for(DBAttempt, "after_update")
+def _recount_changed_attempt(mapper, connection, target):
+    # Scores and earnings change in batches (rescoring, end of session), so
+    # the owners are recounted once per flush rather than once per row
+    attrs = inspect(target).attrs
+    if attrs.wldd_id.history.has_changes():
+        _mark_stats_stale(target, target.wldd_id, *attrs.wldd_id.history.deleted)
+    elif (attrs.score_raw.history.has_changes()
+          or attrs.earnings_raw.history.has_changes()):
+        _mark_stats_stale(target, target.wldd_id)
+
+@event.listens_for(DBAttempt, "after_delete")
+def _recount_deleted_attempt(mapper, connection, target):
+    _mark_stats_stale(target, target.wldd_id)
+
+@event.listens_for(Session, "after_flush")
+def _recount_stale_users(session, flush_context):
+    stale = session.info.pop("stale_user_stats", None)
+    if stale:
+        DBUser.recount_stats(session.connection(), sorted(stale))
 
 class DBVerification(Base):
     __tablename__ = "verifications"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    id = Column(GUID(), primary_key=True, default=uuid4)
     nullifier_hash = Column(String, nullable=False)
     merkle_root = Column(String, nullable=False)
     action = Column(String, nullable=False)
@@ -185,7 +391,7 @@ class DBVerification(Base):
 class DBPayment(Base):
     __tablename__ = "payments"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    id = Column(GUID(), primary_key=True, default=uuid4)
     reference = Column(String, unique=True, nullable=False)
     status = Column(String, default="pending")  # pending, confirmed, failed
     transaction_id = Column(String, nullable=True)
@@ -196,7 +402,7 @@ class DBPayment(Base):
     # Add consumption tracking
     consumed = Column(Boolean, default=False)
     consumed_at = Column(DateTime(timezone=True), nullable=True)
-    consumed_by_attempt_id = Column(UUID(as_uuid=True), ForeignKey('attempts.id'), nullable=True)
+    consumed_by_attempt_id = Column(GUID(), ForeignKey('attempts.id'), nullable=True)
     
     user = relationship("DBUser", back_populates="payments")
     consumed_by_attempt = relationship("DBAttempt", foreign_keys=[consumed_by_attempt_id])
@@ -206,15 +412,37 @@ class DBPayment(Base):
         Index('idx_payment_user', 'wldd_id'),
     )
 
-    @property
+    @classmethod
+    def try_consume(cls, session: Session, payment_id, attempt_id) -> bool:
+        """Atomically mark a payment consumed by an attempt.
+
+        Returns False if the payment was already consumed.
+        """
+        result = session.execute(
+            update(cls)
+            .where(cls.id == payment_id, cls.consumed.is_(False))
+            .values(
+                consumed=True,
+                consumed_at=datetime.now(UTC),
+                consumed_by_attempt_id=attempt_id,
+            )
+        )
+        return result.rowcount == 1
+
+    @hybrid_property
     def amount(self):
         """Get amount in USDC/WLD units"""
-        return round(float(self.amount_raw) * 10**-6, 2) if self.amount_raw is not None else None
+        return _to_usdc(self.amount_raw) if self.amount_raw is not None else None
         
     @amount.setter
     def amount(self, value):
         """Set amount from USDC/WLD units"""
         if value is not None:
-            self.amount_raw = int(value * 10**6)
+            self.amount_raw = int(value * _USDC_SCALE)
         else:
-            self.amount_raw = None
\ No newline at end of file
+            self.amount_raw = None
+
+    @amount.expression
+    def amount(cls):
+        """Amount in USDC/WLD units, computed in SQL"""
+        return _to_usdc_sql(cls.amount_raw)
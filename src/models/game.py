@@ -1,12 +1,17 @@
 # src/models/game.py
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from typing import List, Optional, Dict
 from datetime import datetime
 from uuid import UUID, uuid4
 from enum import Enum
 from zoneinfo import ZoneInfo
 UTC = ZoneInfo("UTC")
+_UTC = UTC
+_now = datetime.now
+
+def _utcnow() -> datetime:
+    return _now(_UTC)
 
 class SessionStatus(str, Enum):
     PENDING = "pending"
@@ -20,18 +25,22 @@ class Language(str, Enum):
     PORTUGUESE = "portuguese"
 
 class Message(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     content: str
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = Field(default_factory=_utcnow)
     ai_response: Optional[str] = None
 
 class GameAttempt(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     id: UUID = Field(default_factory=uuid4)
     session_id: UUID
     wldd_id: str
     messages: List[Message] = Field(default_factory=list)
     is_winner: bool = False
     messages_remaining: int = Field(default=5)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=_utcnow)
     
     @field_validator("messages")
     @classmethod
@@ -60,8 +69,8 @@ class GameSession(BaseModel):
 
 class User(BaseModel):
     wldd_id: str
-    created_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
-    last_active: datetime = Field(default_factory=lambda: datetime.now(UTC))
+    created_at: datetime = Field(default_factory=_utcnow)
+    last_active: datetime = Field(default_factory=_utcnow)
     total_games_played: int = Field(default=0, ge=0)
     total_games_won: int = Field(default=0, ge=0)
     total_winnings: float = Field(default=0, ge=0)
@@ -73,12 +82,12 @@ class User(BaseModel):
     def add_attempt(self, attempt_id: UUID):
         self.game_attempts.append(attempt_id)
         self.total_games_played += 1
-        self.last_active = datetime.now(UTC)
+        self.last_active = _utcnow()
 
     def add_win(self, winnings: float):
         self.total_games_won += 1
         self.total_winnings += winnings
-        self.last_active = datetime.now(UTC)
+        self.last_active = _utcnow()
 
     def get_stats(self) -> Dict[str, float]:
         return {
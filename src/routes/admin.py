@@ -1,5 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, Security, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Security, BackgroundTasks, Response, Query
 from fastapi.security import APIKeyHeader
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from src.database import get_db
 from src.models.game import SessionStatus
 from src.models.database_models import DBSession, DBAttempt, DBUser, DBMessage, DBVerification
@@ -9,30 +10,99 @@ from zoneinfo import ZoneInfo
 from uuid import UUID
 from tabulate import tabulate
 import os
-from sqlalchemy.orm import Session
-import random
-import asyncio
+import hmac
+from sqlalchemy.orm import Session, selectinload, aliased
+from sqlalchemy import func, and_, not_, case, cast, select, update, Float, BigInteger
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+import time
+import orjson
+import logging
 
 router = APIRouter(prefix="/admin")
+logger = logging.getLogger("bungo.admin")
 
 # Set up API key header properly
 API_KEY = os.getenv("ADMIN_API_KEY")
+_API_KEY_BYTES = API_KEY.encode() if API_KEY else None
 API_KEY_NAME = "X-Admin-Key"  # Match frontend
 api_key_header = APIKeyHeader(name=API_KEY_NAME)
 
 UTC = ZoneInfo("UTC")
 
+USER_LIST_BATCH_SIZE = 500  # rows per fetch when streaming /admin/users
+
+# Timestamps are stored in UTC, but SQLite hands DateTime(timezone=True)
+# columns back naive; have orjson mark both kinds as UTC ("...Z")
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z
+
+# Admin handlers return this directly: FastAPI passes Response objects through
+# untouched, skipping jsonable_encoder, and orjson handles UUIDs and datetimes
+class UTCORJSONResponse(ORJSONResponse):
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+# Rendered /admin/sessions/{id} bodies of completed sessions, as
+# (body, expiry). Settling and rescoring (verify_session/force_score_attempt)
+# still change them: those paths drop this process's entry and the TTL bounds
+# how long other workers keep serving the old scores.
+COMPLETED_DETAILS_CACHE_SIZE = 128
+COMPLETED_DETAILS_CACHE_TTL = 30  # seconds
+_completed_details_cache = {}
+
+# Rendered /admin/sessions body for polling admin pages. New attempts only
+# show up once it expires; creating or ending a session clears it here.
+SESSIONS_LIST_CACHE_TTL = 30  # seconds
+_sessions_list_cache = {"body": None, "exp": 0.0}
+
+def invalidate_sessions_list_cache():
+    """Drop the cached /admin/sessions body (call whenever a session starts or ends)"""
+    _sessions_list_cache["body"] = None
+
+def invalidate_session_details_cache(session_id):
+    """Drop a session's cached /admin/sessions/{id} body (call after settling or rescoring)"""
+    _completed_details_cache.pop(session_id, None)
+
 async def get_api_key(api_key_header: str = Security(api_key_header)):
     """Verify admin API key from header"""
-    if not API_KEY or api_key_header != API_KEY:
+    # Constant-time comparison so the key can't be recovered from timings
+    if _API_KEY_BYTES is None or not hmac.compare_digest(api_key_header.encode(), _API_KEY_BYTES):
         raise HTTPException(
             status_code=401,  # Changed from 403 to match the error
             detail="Not authenticated"
         )
     return api_key_header
 
+def create_active_session(db: Session, entry_fee: float, duration_hours: int) -> DBSession:
+    """Start a new active session; raises a 400 if one is already running"""
+    start_time = datetime.now(UTC)
+    end_time = start_time + timedelta(hours=duration_hours)
+    
+    new_session = DBSession(
+        start_time=start_time,
+        end_time=end_time,
+        entry_fee=entry_fee,
+        status=SessionStatus.ACTIVE.value
+    )
+    logger.debug("Created session object with entry_fee_raw=%s", new_session.entry_fee_raw)
+    
+    db.add(new_session)
+    try:
+        db.commit()
+    except IntegrityError:
+        # ux_sessions_one_active rejected a second active session
+        db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail="Active session already exists"
+        )
+    logger.info("Created session %s", new_session.id)
+    invalidate_sessions_list_cache()
+    return new_session
+
 @router.post("/sessions/create")
-async def admin_create_session(
+def admin_create_session(
     entry_fee: float = 10.0,
     duration_hours: int = 1,
     api_key: str = Depends(get_api_key),
@@ -40,338 +110,377 @@ async def admin_create_session(
 ):
     """Create a new active session"""
     try:
-        print(f"Creating session with entry_fee={entry_fee}, duration={duration_hours}")  # Debug log
-        
-        # Check for active session
-        active_session = db.query(DBSession).filter(
-            DBSession.status == SessionStatus.ACTIVE.value
-        ).first()
+        logger.debug("Creating session with entry_fee=%s, duration=%s", entry_fee, duration_hours)
+        new_session = create_active_session(db, entry_fee, duration_hours)
         
-        if active_session:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Active session already exists (ID: {active_session.id})"
-            )
-        
-        start_time = datetime.now(UTC)
-        end_time = start_time + timedelta(hours=duration_hours)
-        
-        new_session = DBSession(
-            start_time=start_time,
-            end_time=end_time,
-            entry_fee=entry_fee,
-            status=SessionStatus.ACTIVE.value
-        )
-        print(f"Created session object with entry_fee_raw={new_session.entry_fee_raw}")  # Debug log
-        
-        db.add(new_session)
-        db.commit()
-        print("Session committed to database")  # Debug log
-        
-        return {
+        return UTCORJSONResponse({
             "message": "Session created successfully",
             "session_id": new_session.id,
-            "start_time": start_time,
-            "end_time": end_time,
+            "start_time": new_session.start_time,
+            "end_time": new_session.end_time,
             "entry_fee": entry_fee
-        }
+        })
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Error creating session: {str(e)}")  # Debug log
+        logger.error("Error creating session: %s", e)
         db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
-async def create_next_session(delay_minutes: int = 1):
-    print(f"Scheduling next session in {delay_minutes} minutes...")
-    await asyncio.sleep(delay_minutes * 60)
-    
-    db = next(get_db())
-    try:
-        api_key = os.getenv("ADMIN_API_KEY")
-        if not api_key:
-            print("Error: No ADMIN_API_KEY found in environment")
-            return
-            
-        print("Creating next session...")
-        await admin_create_session(
-            entry_fee=0.1,
-            duration_hours=1,
-            api_key=api_key,
-            db=db
-        )
-        print("Next session created successfully")
-    except Exception as e:
-        print(f"Error creating next session: {str(e)}")
-    finally:
-        db.close()
-
 @router.post("/sessions/{session_id}/end")
-async def admin_end_session(
+def admin_end_session(
     session_id: UUID,
     api_key: str = Depends(get_api_key),
     db = Depends(get_db)
 ):
     """End a specific session"""
-    print(f"=== Ending Session {session_id} ===")
+    logger.info("Ending session %s", session_id)
     
-    session = db.query(DBSession).filter(DBSession.id == session_id).first()
+    session = db.get(DBSession, session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    print(f"Total pot (raw): {session.total_pot_raw}")
-    print(f"Total pot (USDC): {session.total_pot}")
+    # Claim the session by flipping it to completed only while it is still
+    # active; a second caller (another worker's scheduler, a double click)
+    # matches no row and must not redraw the winner or rewrite payouts
+    claimed = db.execute(
+        update(DBSession)
+        .where(DBSession.id == session_id, DBSession.status == SessionStatus.ACTIVE.value)
+        .values(status=SessionStatus.COMPLETED.value)
+    ).rowcount
+    if not claimed:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Session is not active")
     
-    # Get all scored attempts
-    attempts = db.query(DBAttempt).filter(
-        DBAttempt.session_id == session_id,
-        DBAttempt.score.isnot(None)
-    ).order_by(DBAttempt.score.desc()).all()
+    # Scored attempts; is_free_attempt may be NULL on old rows, which count as paid
+    scored = and_(DBAttempt.session_id == session_id, DBAttempt.score_raw.isnot(None))
+    paid = and_(scored, DBAttempt.is_free_attempt.isnot(True))
     
-    # Separate paid and free attempts
-    paid_attempts = [a for a in attempts if not a.is_free_attempt]
-    free_attempts = [a for a in attempts if a.is_free_attempt]
+    # Counts, the paid score total and the top score in one aggregate query
+    total_attempts, paid_count, total_score_raw, max_score_raw = db.query(
+        func.count(DBAttempt.id),
+        func.count(DBAttempt.id).filter(DBAttempt.is_free_attempt.isnot(True)),
+        func.coalesce(func.sum(DBAttempt.score_raw).filter(DBAttempt.is_free_attempt.isnot(True)), 0),
+        func.max(DBAttempt.score_raw)
+    ).filter(scored).one()
+    free_count = total_attempts - paid_count
     
-    print(f"\nFound {len(attempts)} total scored attempts:")
-    print(f"- {len(paid_attempts)} paid attempts")
-    print(f"- {len(free_attempts)} free attempts")
+    logger.debug(
+        "Session %s: pot %s USDC, %d scored attempts (%d paid, %d free), paid score total %s",
+        session_id, session.total_pot, total_attempts, paid_count, free_count, total_score_raw / 1000
+    )
     
-    if attempts:
-        # Calculate total score across paid attempts only
-        total_score = sum(attempt.score for attempt in paid_attempts)
-        print(f"\nTotal score across paid attempts: {total_score}")
+    winning_attempt = None
+    if total_attempts:
         pot = session.total_pot
-        print(f"Pot to distribute: {pot} WLD")
         
-        # Set all free attempts to 0 earnings
-        for attempt in free_attempts:
-            attempt.earnings = 0
-
-        # First pass - calculate initial shares and identify low scores
-        if total_score > 0:
+        is_free = DBAttempt.is_free_attempt.is_(True)
+        if total_score_raw > 0:
             min_threshold_usdc = 0.1
-            saved_earnings = 0  # From < 0.1 USDC attempts
-            low_score_earnings = 0  # From scores 3-4
-            qualifying_score_total = 0
-            qualifying_attempts = []
-            
-            for attempt in paid_attempts:
-                share = (attempt.score / total_score) * pot
-                if share < min_threshold_usdc:
-                    attempt.earnings = 0
-                    saved_earnings += share
-                    print(f"\nPaid attempt {attempt.id} below threshold:")
-                    print(f"  Score: {attempt.score}")
-                    print(f"  Would earn: {share:.4f} USDC (below {min_threshold_usdc} USDC threshold)")
-                elif attempt.score <= 4:
-                    attempt.earnings = 0
-                    low_score_earnings += share
-                    print(f"\nPaid attempt {attempt.id} low score (3-4):")
-                    print(f"  Score: {attempt.score}")
-                    print(f"  Would earn: {share:.4f} USDC (50% to devs, 50% redistributed)")
-                else:
-                    qualifying_attempts.append(attempt)
-                    qualifying_score_total += attempt.score
-                    print(f"\nQualifying attempt {attempt.id}:")
-                    print(f"  Score: {attempt.score}")
-                    print(f"  Initial share: {share:.4f} USDC")
-            
+            # Each paid attempt's proportional share of the pot, in USDC
+            share = cast(DBAttempt.score_raw, Float) / total_score_raw * pot
+            below_threshold = share < min_threshold_usdc
+            low_score = and_(share >= min_threshold_usdc, DBAttempt.score_raw <= 4000)
+            qualifying = and_(share >= min_threshold_usdc, DBAttempt.score_raw > 4000)
+
+            # Shares below 0.1 USDC are saved; scores 3-4 are split 50/50
+            # between the devs and the qualifying attempts (score >= 5)
+            saved_earnings, low_score_earnings, qualifying_score_raw = db.query(
+                func.coalesce(func.sum(share).filter(below_threshold), 0.0),
+                func.coalesce(func.sum(share).filter(low_score), 0.0),
+                func.coalesce(func.sum(DBAttempt.score_raw).filter(qualifying), 0)
+            ).filter(paid).one()
+
             # Calculate amount to redistribute (50% of low score earnings)
             redistribution_amount = low_score_earnings * 0.5
             dev_earnings = low_score_earnings * 0.5
-            print(f"\nLow score earnings (scores 3-4): {low_score_earnings:.4f} USDC")
-            print(f"Amount to redistribute: {redistribution_amount:.4f} USDC")
-            print(f"Amount to developers: {dev_earnings:.4f} USDC")
-            
-            # Second pass - distribute to qualifying attempts (score >= 5)
-            if qualifying_attempts:
-                # Add redistribution amount to the qualifying attempts
-                for attempt in qualifying_attempts:
-                    base_share = (attempt.score / total_score) * pot
-                    bonus_share = (attempt.score / qualifying_score_total) * redistribution_amount
-                    total_share = base_share + bonus_share
-                    print(f"\nCalculating final share for attempt {attempt.id}:")
-                    print(f"  Score: {attempt.score}")
-                    print(f"  Base share: {base_share:.4f} USDC")
-                    print(f"  Bonus share: {bonus_share:.4f} USDC")
-                    print(f"  Total share: {total_share:.4f} USDC")
-                    attempt.earnings = total_share
-                    print(f"  Earnings stored (raw): {attempt.earnings_raw}")
+            logger.debug(
+                "Low score earnings (scores 3-4): %.4f USDC, %.4f redistributed, %.4f to developers",
+                low_score_earnings, redistribution_amount, dev_earnings
+            )
+
+            # Qualifying paid attempts get their base share plus a score-weighted
+            # part of the redistribution; free and all other attempts get 0
+            earnings_raw = 0
+            if qualifying_score_raw:
+                bonus_share = cast(DBAttempt.score_raw, Float) / qualifying_score_raw * redistribution_amount
+                earnings_raw = case(
+                    (and_(not_(is_free), qualifying),
+                     cast((share + bonus_share) * 1_000_000, BigInteger)),
+                    else_=0
+                )
             
-            print(f"\nFinal distribution:")
-            print(f"  Total pot: {pot:.4f} USDC")
-            print(f"  Paid to attempts: {(pot - saved_earnings - dev_earnings):.4f} USDC")
-            print(f"  Saved (< 0.1 USDC): {saved_earnings:.4f} USDC")
-            print(f"  To developers: {dev_earnings:.4f} USDC")
+            logger.info(
+                "Session %s payout: pot %.4f, paid %.4f, saved (< 0.1) %.4f, developers %.4f USDC",
+                session_id, pot, pot - saved_earnings - dev_earnings, saved_earnings, dev_earnings
+            )
         else:
-            print(f"No paid attempts with scores > 0 found for session {session_id}")
+            logger.info("No paid attempts with scores > 0 found for session %s", session_id)
+            # Free attempts always get 0 earnings
+            earnings_raw = case((is_free, 0), else_=DBAttempt.earnings_raw)
+
+        # A single UPDATE settles every scored attempt; no attempt rows are loaded
+        db.query(DBAttempt).filter(scored)\
+            .update({DBAttempt.earnings_raw: earnings_raw}, synchronize_session=False)
+
+        # Bulk updates bypass the attempt listeners that maintain user stats
+        DBUser.recount_stats(db, select(DBAttempt.wldd_id).where(DBAttempt.session_id == session_id))
         
-        # Find highest scoring attempt among ALL attempts for winning conversation
-        max_score = attempts[0].score
-        top_attempts = [a for a in attempts if a.score == max_score]
-        winning_attempt = random.choice(top_attempts)
+        # Highest scoring attempt among ALL attempts wins; ties are broken at
+        # random by the database, so only the winning row comes back
+        winning_attempt = db.query(DBAttempt.id, DBAttempt.is_free_attempt)\
+            .filter(scored)\
+            .order_by(DBAttempt.score_raw.desc(), func.random())\
+            .first()
         session.winning_attempt_id = winning_attempt.id
-        print(f"\nSelected winning attempt {winning_attempt.id} {'(free attempt)' if winning_attempt.is_free_attempt else '(paid attempt)'}")
+        logger.info(
+            "Selected winning attempt %s (%s attempt)",
+            winning_attempt.id, "free" if winning_attempt.is_free_attempt else "paid"
+        )
     
-    session.status = SessionStatus.COMPLETED.value
     db.commit()
+    invalidate_sessions_list_cache()
+    invalidate_session_details_cache(session_id)
     
-    return {
+    return UTCORJSONResponse({
         "message": "Session ended",
         "session_id": session_id,
         "final_pot": session.total_pot,
-        "total_attempts": len(attempts),
-        "paid_attempts": len(paid_attempts),
-        "free_attempts": len(free_attempts),
-        "highest_score": max((a.score for a in attempts), default=0) if attempts else None,
+        "total_attempts": total_attempts,
+        "paid_attempts": paid_count,
+        "free_attempts": free_count,
+        "highest_score": max_score_raw / 1000 if total_attempts else None,
         "winning_attempt_id": session.winning_attempt_id,
         "winning_attempt_was_free": winning_attempt.is_free_attempt if winning_attempt else None
-    }
+    })
 
 @router.get("/sessions")
-async def list_sessions(
+def list_sessions(
     api_key: str = Depends(get_api_key),
     db = Depends(get_db)
 ):
     """List all sessions"""
-    sessions = db.query(DBSession).order_by(DBSession.start_time.desc()).all()
+    body = _sessions_list_cache["body"]
+    if body is not None and time.monotonic() < _sessions_list_cache["exp"]:
+        return Response(content=body, media_type="application/json")
+
+    # Attempt counts come from one grouped query instead of loading every
+    # session's attempts; count() of a column skips NULLs (unscored). The
+    # winner's score rides along on the same query rather than a lazy load
+    # per completed session. Only the listed columns are selected, so rows
+    # come back as plain tuples without hydrating DBSession objects.
+    winner = aliased(DBAttempt)
+    rows = db.execute(
+        select(
+            DBSession.id,
+            DBSession.status,
+            DBSession.start_time,
+            DBSession.end_time,
+            DBSession.entry_fee.label("entry_fee"),
+            DBSession.total_pot.label("total_pot"),
+            DBSession.winning_attempt_id,
+            func.count(DBAttempt.id).label("total_attempts"),
+            func.count(DBAttempt.score_raw).label("scored_attempts"),
+            winner.score.label("highest_score")
+        )
+        .outerjoin(DBAttempt, DBAttempt.session_id == DBSession.id)
+        .outerjoin(winner, DBSession.winning_attempt_id == winner.id)
+        .group_by(DBSession.id, winner.id)
+        .order_by(DBSession.start_time.desc())
+    ).all()
     
-    session_data = []
-    for session in sessions:
-        data = {
-            "id": str(session.id),
-            "status": session.status,
-            "start_time": session.start_time.strftime("%Y-%m-%d %H:%M"),
-            "end_time": session.end_time.strftime("%Y-%m-%d %H:%M"),
-            "entry_fee": session.entry_fee,
-            "total_pot": session.total_pot,
-            "total_attempts": len(session.attempts),
-            "scored_attempts": len([a for a in session.attempts if a.score is not None])
+    completed = SessionStatus.COMPLETED.value
+    session_data = [
+        {
+            "id": row.id,
+            "status": row.status,
+            "start_time": row.start_time,
+            "end_time": row.end_time,
+            "entry_fee": row.entry_fee,
+            "total_pot": row.total_pot,
+            "total_attempts": row.total_attempts,
+            "scored_attempts": row.scored_attempts,
+            # Only include winner info for completed sessions
+            **({
+                "winning_attempt_id": row.winning_attempt_id,
+                "highest_score": row.highest_score
+            } if row.status == completed and row.winning_attempt_id else {})
         }
-        
-        # Only include winner info for completed sessions
-        if session.status == SessionStatus.COMPLETED.value and session.winning_attempt:
-            data["winning_attempt_id"] = str(session.winning_attempt_id)
-            data["highest_score"] = session.winning_attempt.score
-            
-        session_data.append(data)
+        for row in rows
+    ]
     
-    return session_data
+    response = UTCORJSONResponse(session_data)
+    _sessions_list_cache["body"] = response.body
+    _sessions_list_cache["exp"] = time.monotonic() + SESSIONS_LIST_CACHE_TTL
+    return response
 
 @router.get("/sessions/{session_id}")
-async def get_session_details(
+def get_session_details(
     session_id: UUID,
     api_key: str = Depends(get_api_key),
     db = Depends(get_db)
 ):
     """Get detailed information about a specific session"""
-    session = db.query(DBSession).filter(DBSession.id == session_id).first()
+    cached = _completed_details_cache.get(session_id)
+    if cached is not None and time.monotonic() < cached[1]:
+        return Response(content=cached[0], media_type="application/json")
+
+    # Attempts and their messages in two batched queries; the owning user is
+    # never read here, so fail loudly if that changes
+    session = db.query(DBSession).options(
+        selectinload(DBSession.attempts).selectinload(DBAttempt.messages),
+        selectinload(DBSession.attempts).raiseload(DBAttempt.user)
+    ).filter(DBSession.id == session_id).first()
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    attempts = []
-    for attempt in session.attempts:
-        messages = [
-            {
-                "content": msg.content,
-                "ai_response": msg.ai_response
-            } for msg in attempt.messages
-        ]
-        attempts.append({
-            "id": str(attempt.id),
+    attempts = [
+        {
+            "id": attempt.id,
             "wldd_id": attempt.wldd_id,
             "score": attempt.score or "Not scored",
-            "message_count": len(messages),
-            "messages": messages,
+            "message_count": len(attempt.messages),
+            "messages": [
+                {
+                    "content": msg.content,
+                    "ai_response": msg.ai_response
+                } for msg in attempt.messages
+            ],
             "remaining": attempt.messages_remaining,
-            "is_winner": bool(attempt.score and attempt.score > 7.0),
+            "is_winner": bool(attempt.is_winner),
             "earnings_raw": attempt.earnings_raw
-        })
+        }
+        for attempt in session.attempts
+    ]
 
-    return {
+    response = UTCORJSONResponse({
         "session": {
-            "id": str(session.id),
+            "id": session.id,
             "status": session.status,
-            "start_time": session.start_time.strftime("%Y-%m-%d %H:%M"),
-            "end_time": session.end_time.strftime("%Y-%m-%d %H:%M"),
+            "start_time": session.start_time,
+            "end_time": session.end_time,
             "entry_fee": session.entry_fee,
             "total_pot": session.total_pot
         },
         "attempts": attempts
-    }
+    })
+    if session.status == SessionStatus.COMPLETED.value:
+        if len(_completed_details_cache) >= COMPLETED_DETAILS_CACHE_SIZE:
+            # Evict the oldest entry (dicts keep insertion order)
+            del _completed_details_cache[next(iter(_completed_details_cache))]
+        _completed_details_cache.pop(session_id, None)
+        _completed_details_cache[session_id] = (
+            response.body, time.monotonic() + COMPLETED_DETAILS_CACHE_TTL
+        )
+    return response
+
+# World ID nullifier hashes are 0x-prefixed 32-byte hex strings
+NULLIFIER_HASH_PATTERN = r"^0x[0-9a-fA-F]{64}$"
 
 @router.post("/add-verification")
-async def add_verification(
-    nullifier_hash: str,
+def add_verification(
+    nullifier_hash: str = Query(pattern=NULLIFIER_HASH_PATTERN),
+    name: str = "Test User",
     api_key: str = Depends(get_api_key),
     db: Session = Depends(get_db)
 ):
     """Manually add a verification for testing"""
-    print(f"Adding verification for hash: {nullifier_hash}")
+    logger.debug("Adding verification for hash: %s", nullifier_hash)
+    now = datetime.now(UTC)
     verification = DBVerification(
         nullifier_hash=nullifier_hash,
         merkle_root="0x29334c9988e5ff13fb0d9531bc6a2ed372a89dcd30ef47d74eee528e28f08648",
         action="enter",
-        created_at=datetime.now(UTC)
+        created_at=now
     )
     
-    # Also create user if doesn't exist
-    user = db.query(DBUser).filter(DBUser.wldd_id == nullifier_hash).first()
-    if not user:
-        user = DBUser(
-            wldd_id=nullifier_hash,
-            created_at=datetime.now(UTC),
-            last_active=datetime.now(UTC)
-        )
-        db.add(user)
+    # Also create user if doesn't exist, in one INSERT ... ON CONFLICT DO NOTHING
+    insert = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    db.execute(
+        insert(DBUser)
+        .values(wldd_id=nullifier_hash, name=name, created_at=now, last_active=now)
+        .on_conflict_do_nothing(index_elements=[DBUser.wldd_id])
+    )
     
     db.add(verification)
     db.commit()
     
-    return {
+    return UTCORJSONResponse({
         "success": True,
         "verification": {
             "nullifier_hash": verification.nullifier_hash,
             "merkle_root": verification.merkle_root,
             "action": verification.action
         }
-    }
+    })
 
 @router.get("/users")
-async def list_users(
+def list_users(
     api_key: str = Depends(get_api_key),
     db = Depends(get_db)
 ):
     """List all users"""
-    users = db.query(DBUser).order_by(DBUser.created_at.desc()).all()
+    # Attempt count and earnings come from the user counters; the best score
+    # is a correlated MAX answered from idx_attempts_wldd
+    best_score_raw = select(func.coalesce(func.max(DBAttempt.score_raw), 0))\
+        .where(DBAttempt.wldd_id == DBUser.wldd_id)\
+        .scalar_subquery()
+    users = db.query(DBUser, best_score_raw)\
+        .order_by(DBUser.created_at.desc())\
+        .yield_per(USER_LIST_BATCH_SIZE)
     
-    return [{
-        "wldd_id": user.wldd_id,
-        "created_at": user.created_at,
-        "last_active": user.last_active,
-        "total_attempts": len(user.attempts),
-        "total_earnings": sum(a.earnings for a in user.attempts if a.earnings),
-        "best_score": max((a.score for a in user.attempts if a.score), default=0)
-    } for user in users]
+    def generate():
+        # Rows are fetched from a server-side cursor and written out as they
+        # arrive, so the full list is never held in memory
+        yield b"["
+        for i, (user, best_raw) in enumerate(users):
+            if i:
+                yield b","
+            yield orjson.dumps({
+                "wldd_id": user.wldd_id,
+                "created_at": user.created_at,
+                "last_active": user.last_active,
+                "total_attempts": user.total_games,
+                "total_earnings": user.total_earnings,
+                "best_score": best_raw / 1000
+            }, option=ORJSON_OPTIONS)
+        yield b"]"
+    
+    return StreamingResponse(generate(), media_type="application/json")
 
 @router.get("/users/{wldd_id}")
-async def get_user_details(
+def get_user_details(
     wldd_id: str,
     api_key: str = Depends(get_api_key),
     db = Depends(get_db)
 ):
     """Get detailed user information"""
-    user = db.query(DBUser).filter(DBUser.wldd_id == wldd_id).first()
+    user = db.get(DBUser, wldd_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    return {
+    # Message counts come from a grouped join rather than loading every
+    # message body just to len() it
+    attempts = db.query(
+        DBAttempt.id,
+        DBAttempt.session_id,
+        DBAttempt.score,
+        func.count(DBMessage.id),
+        DBAttempt.created_at
+    ).outerjoin(DBAttempt.messages)\
+        .filter(DBAttempt.wldd_id == wldd_id)\
+        .group_by(DBAttempt.id)\
+        .all()
+
+    return UTCORJSONResponse({
         "wldd_id": user.wldd_id,
         "created_at": user.created_at,
         "last_active": user.last_active,
         "attempts": [{
-            "id": attempt.id,
-            "session_id": attempt.session_id,
-            "score": attempt.score,
-            "messages": len(attempt.messages),
-            "created_at": attempt.created_at
-        } for attempt in user.attempts]
-    } 
\ No newline at end of file
+            "id": attempt_id,
+            "session_id": session_id,
+            "score": score,
+            "messages": message_count,
+            "created_at": created_at
+        } for attempt_id, session_id, score, message_count, created_at in attempts]
+    })
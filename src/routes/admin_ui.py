@@ -1,11 +1,15 @@
 from fastapi import APIRouter, Depends, Request
 from fastapi.templating import Jinja2Templates
 from pathlib import Path
+import os
 
 router = APIRouter(prefix="/admin-ui")
 
 # Set up templates
 templates = Jinja2Templates(directory="templates")
+# Compiled templates stay cached for the life of the process; only check the
+# files for edits (a stat() per render) when running with reload in dev
+templates.env.auto_reload = os.getenv("DEV_RELOAD", "0") == "1"
 
 @router.get("/")
 async def admin_panel(request: Request):
@@ -8,29 +8,34 @@ from typing import List, Optional
 from pydantic import BaseModel, Field, validator
 from datetime import datetime, timedelta, date
 from src.models.game import GameSession, SessionStatus, GameAttempt, Message
-from src.models.database_models import DBSession, DBAttempt, DBMessage, DBUser, DBVerification, DBPayment
-from sqlalchemy.orm import Session
+from src.models.database_models import DBSession, DBAttempt, DBMessage, DBUser, DBVerification, DBPayment, _to_usdc
+from sqlalchemy.orm import Session, configure_mappers, contains_eager, selectinload
 from uuid import UUID, uuid4
 from zoneinfo import ZoneInfo
 from src.services.score import get_score_service
 from src.services.llm_service import LLMService
-from src.database import engine, get_db, get_llm_service
+from src.database import engine, get_db, get_llm_service, SessionLocal
 from src.services.conversation import ConversationManager
 from src.services.exceptions import LLMServiceError
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response
+from fastapi.concurrency import run_in_threadpool
 from src.routes.admin import (
     router as admin_router, 
     get_api_key,
-    admin_create_session,
-    admin_end_session
+    admin_end_session,
+    create_active_session,
+    invalidate_sessions_list_cache,
+    invalidate_session_details_cache,
+    ORJSON_OPTIONS
 )
 from src.routes.admin_ui import router as admin_ui_router
-from fastapi.templating import Jinja2Templates
 from fastapi import BackgroundTasks
 import time
 import httpx
+import orjson
 import os
-from sqlalchemy import and_
+from sqlalchemy import and_, func
 import secrets
 import json
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
@@ -43,7 +48,7 @@ logger = setup_logging()
 
 UTC = ZoneInfo("UTC")
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # Add CORS middleware
 app.add_middleware(
@@ -64,6 +69,15 @@ app.include_router(admin_ui_router)
 
 DEFAULT_ENTRY_FEE = 10.0  # Default WLDD tokens per game
 
+# /sessions/current is polled by every open client; serve the rendered body
+# for a second instead of querying the session and its attempts each time
+CURRENT_SESSION_CACHE_TTL = 1  # seconds
+_current_session_cache = {"body": None, "exp": 0.0}
+
+def invalidate_current_session_cache():
+    """Drop the cached /sessions/current body after the active session changes"""
+    _current_session_cache["body"] = None
+
 class CreateUserRequest(BaseModel):
     wldd_id: str
     language: Optional[str] = Field(default="ENGLISH")
@@ -100,6 +114,19 @@ class SessionResponse(BaseModel):
    def round_amounts(cls, v):
        return round(v, 2) if v is not None else v
 
+def session_response(session: DBSession, attempts: List[dict], winning_conversation=None) -> SessionResponse:
+    """Build the response for a session from its row and the attempts to show"""
+    return SessionResponse(
+        id=session.id,
+        start_time=session.start_time,
+        end_time=session.end_time,
+        entry_fee=session.entry_fee,
+        total_pot=session.total_pot,
+        status=session.status,
+        attempts=attempts,
+        winning_conversation=winning_conversation
+    )
+
 # At the top of api.py with other models
 class UserResponse(BaseModel):
     wldd_id: str
@@ -154,7 +181,7 @@ class AdminAttemptFilters(BaseModel):
     wldd_id: Optional[str] = None
 
 # Move these helper functions before the routes
-async def verify_world_id_credentials(
+def verify_world_id_credentials(
     request: Request,
     db: Session = Depends(get_db)
 ) -> Optional[WorldIDCredentials]:
@@ -201,7 +228,7 @@ async def verify_world_id_credentials(
     return parsed_creds
 
 @app.get("/userinfo/has_free_attempt", response_model=bool)
-async def has_free_attempt(
+def has_free_attempt(
     db: Session = Depends(get_db),
     credentials: Optional[WorldIDCredentials] = Depends(verify_world_id_credentials),
 ):
@@ -216,7 +243,7 @@ async def has_free_attempt(
     wldd_id = credentials.nullifier_hash
     logger.info(f"Checking free attempt for wldd_id: {wldd_id}")
     
-    user = db.query(DBUser).filter(DBUser.wldd_id == wldd_id).first()
+    user = db.get(DBUser, wldd_id)
     if not user:
         logger.info(f"User not found in has_free_attempt for wldd_id: {wldd_id}")
         raise HTTPException(status_code=404, detail="User not found")
@@ -226,88 +253,77 @@ async def has_free_attempt(
 
 # Modify session creation to be more explicit about timing
 @app.post("/sessions/create", response_model=SessionResponse)
-async def create_session(
+def create_session(
     entry_fee: float,
     duration_hours: int = 24,
     api_key: str = Depends(get_api_key),  # Add API key requirement
     db: Session = Depends(get_db)
 ):
     try:
-        # Check for active session with row lock
-        active_session = db.query(DBSession).with_for_update().filter(
-            DBSession.status == SessionStatus.ACTIVE.value
-        ).first()
+        # No pre-check: ux_sessions_one_active rejects a second active
+        # session and create_active_session turns that into a 400
+        db_session = create_active_session(db, entry_fee, duration_hours)
+        invalidate_current_session_cache()
         
-        if active_session:
-            raise HTTPException(status_code=400, detail="Active session already exists")
+        # The commit expired db_session, so the first read below reloads it
+        # in one SELECT (what the old explicit db.refresh() cost)
+        print(f"Session timing: Start={db_session.start_time.isoformat()}, End={db_session.end_time.isoformat()}")
         
-        start_time = datetime.now(UTC)
-        end_time = start_time + timedelta(hours=duration_hours)
-        
-        print(f"Session timing: Start={start_time.isoformat()}, End={end_time.isoformat()}")
-        
-        db_session = DBSession(
-            start_time=start_time,
-            end_time=end_time,
-            entry_fee=entry_fee,
-            status=SessionStatus.ACTIVE.value
-        )
-        
-        db.add(db_session)
-        db.commit()
-        db.refresh(db_session)
-        
-        return SessionResponse(
-            id=db_session.id,
-            start_time=db_session.start_time,
-            end_time=db_session.end_time,
-            entry_fee=db_session.entry_fee,
-            total_pot=db_session.total_pot,
-            status=db_session.status,
-            attempts=[]
-        )
+        return session_response(db_session, [])
         
+    except HTTPException:
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
+def render_current_session(db: Session) -> Optional[bytes]:
+    """Render and cache the active session's body; None if there is none"""
+    session = db.query(DBSession).filter(
+        DBSession.status == SessionStatus.ACTIVE.value
+    ).first()
+    if not session:
+        return None
+    
+    attempts = db.query(DBAttempt).filter(
+        DBAttempt.session_id == session.id
+    ).all()
+    
+    response = session_response(session, [{
+        'id': attempt.id,
+        'score': attempt.score,
+        'earnings': attempt.earnings
+    } for attempt in attempts])
+    body = orjson.dumps(response.model_dump(), option=ORJSON_OPTIONS)
+    _current_session_cache["body"] = body
+    _current_session_cache["exp"] = time.monotonic() + CURRENT_SESSION_CACHE_TTL
+    return body
+
+# Stays async so the retry waits on the event loop instead of holding a
+# threadpool slot; the queries themselves still run in the threadpool
 @app.get("/sessions/current", response_model=Optional[SessionResponse])
 async def get_current_session(db: Session = Depends(get_db)):
     """Get the current active session with retries if none exists"""
+    body = _current_session_cache["body"]
+    if body is not None and time.monotonic() < _current_session_cache["exp"]:
+        return Response(content=body, media_type="application/json")
+    
     max_retries = 3
     retry_delay = 2  # seconds
     
     for attempt in range(max_retries):
-        session = db.query(DBSession).filter(
-            DBSession.status == SessionStatus.ACTIVE.value
-        ).first()
-        
-        if session:
-            attempts = db.query(DBAttempt).filter(
-                DBAttempt.session_id == session.id
-            ).all()
-            
-            return SessionResponse(
-                id=session.id,
-                start_time=session.start_time,
-                end_time=session.end_time,
-                entry_fee=session.entry_fee,
-                total_pot=session.total_pot,
-                status=session.status,
-                attempts=[{
-                    'id': attempt.id,
-                    'score': attempt.score,
-                    'earnings': attempt.earnings
-                } for attempt in attempts]
-            )
+        body = await run_in_threadpool(render_current_session, db)
+        if body is not None:
+            return Response(content=body, media_type="application/json")
         
         # No session found, wait before retrying
         if attempt < max_retries - 1:  # Don't wait on last attempt
             print(f"No active session found, retrying in {retry_delay} seconds...")
-            await asyncio.sleep(retry_delay)
-            # Refresh DB session to avoid stale data
+            # Hand the connection back to the pool while waiting; the next
+            # query checks out a fresh one and sees new data. Reusing the
+            # request's session means get_db still closes it.
             db.close()
-            db = next(get_db())
+            await asyncio.sleep(retry_delay)
     
     # If we get here, we've exhausted all retries
     raise HTTPException(
@@ -315,9 +331,40 @@ async def get_current_session(db: Session = Depends(get_db)):
         detail="No active session found after retries. Please try again in a moment."
     )
 
+# Registered before /sessions/{session_id}: routes match in order, and that
+# one would otherwise take "stats" and reject it as an invalid UUID
+@app.get("/sessions/stats")
+def get_session_stats(db: Session = Depends(get_db)):
+    """Get global session statistics"""
+    # One aggregate row instead of loading every session
+    completed = DBSession.status == SessionStatus.COMPLETED.value
+    total_sessions, active_sessions, completed_sessions, pot_distributed, all_pots, total_attempts = db.query(
+        func.count(DBSession.id),
+        func.count(DBSession.id).filter(DBSession.status == SessionStatus.ACTIVE.value),
+        func.count(DBSession.id).filter(completed),
+        func.coalesce(func.sum(DBSession.total_pot).filter(completed), 0),
+        func.coalesce(func.sum(DBSession.total_pot), 0),
+        db.query(func.count(DBAttempt.id)).scalar_subquery()
+    ).one()
+    
+    stats = {
+        "total_sessions": total_sessions,
+        "total_active_sessions": active_sessions,
+        "total_completed_sessions": completed_sessions,
+        "total_pot_distributed": pot_distributed,
+        "average_pot_size": all_pots / total_sessions if total_sessions else 0,
+        "total_attempts": total_attempts,
+        "average_attempts_per_session": total_attempts / total_sessions if total_sessions else 0
+    }
+    
+    return stats
+
 @app.get("/sessions/{session_id}", response_model=SessionResponse)
-async def get_session(session_id: UUID, db: Session = Depends(get_db)):
-    session = db.query(DBSession).filter(DBSession.id == session_id).first()
+def get_session(session_id: UUID, db: Session = Depends(get_db)):
+    session = db.query(DBSession).options(
+        selectinload(DBSession.attempts),
+        selectinload(DBSession.winning_attempt).selectinload(DBAttempt.messages)
+    ).filter(DBSession.id == session_id).first()
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
         
@@ -330,94 +377,47 @@ async def get_session(session_id: UUID, db: Session = Depends(get_db)):
             ) for msg in session.winning_attempt.messages
         ]
     
-    return SessionResponse(
-        id=session.id,
-        start_time=session.start_time,
-        end_time=session.end_time,
-        entry_fee=session.entry_fee,
-        total_pot=session.total_pot,
-        status=session.status,
-        attempts=[{
-            'id': attempt.id,
-            'score': attempt.score,
-            'earnings': attempt.earnings
-        } for attempt in session.attempts if attempt.score is not None],
-        winning_conversation=winning_conversation
-    )
+    return session_response(session, [{
+        'id': attempt.id,
+        'score': attempt.score,
+        'earnings': attempt.earnings
+    } for attempt in session.attempts if attempt.score is not None], winning_conversation)
 
 @app.put("/sessions/{session_id}/end", response_model=SessionResponse)
-async def end_session(session_id: UUID, db: Session = Depends(get_db)):
-    session = db.query(DBSession).filter(DBSession.id == session_id).first()
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
-        
-    # Get all scored attempts for this session
+def end_session(session_id: UUID, db: Session = Depends(get_db)):
+    # Settle through the admin path so both endpoints claim the session the
+    # same way and pay out by the same rules; it 404s on unknown sessions and
+    # 400s on ones that are no longer active
+    admin_end_session(session_id=session_id, api_key=None, db=db)
+    invalidate_current_session_cache()
+    
+    session = db.query(DBSession).options(
+        selectinload(DBSession.winning_attempt).selectinload(DBAttempt.messages)
+    ).filter(DBSession.id == session_id).one()
     attempts = db.query(DBAttempt).filter(
         DBAttempt.session_id == session_id,
-        DBAttempt.score.isnot(None)  # Only consider attempts that have been scored
-    ).order_by(DBAttempt.score.desc()).all()
+        DBAttempt.score_raw.isnot(None)  # Only consider attempts that have been scored
+    ).order_by(DBAttempt.score_raw.desc())
     
     winning_conversation = None
-    
-    if attempts:
-        # Separate paid and free attempts
-        paid_attempts = [a for a in attempts if not a.is_free_attempt]
-        
-        # Calculate total score across paid attempts only
-        total_score = sum(attempt.score for attempt in paid_attempts)
-        pot = session.total_pot
-        
-        # Distribute pot based on relative scores (paid attempts only)
-        for attempt in attempts:
-            if attempt.is_free_attempt:
-                attempt.earnings = 0
-            else:
-                # Calculate proportional share of pot
-                share = (attempt.score / total_score) * pot if total_score > 0 else 0
-                attempt.earnings = share
-        
-        # Find highest scoring attempts (including free attempts)
-        max_score = attempts[0].score  # We know attempts is sorted desc
-        top_attempts = [a for a in attempts if a.score == max_score]
-        
-        # Randomly select one of the highest scoring attempts
-        import random
-        winning_attempt = random.choice(top_attempts)
-        
-        # Store the winning attempt in the session
-        session.winning_attempt_id = winning_attempt.id
-        
-        # Prepare winning conversation for response
+    if session.winning_attempt:
         winning_conversation = [
             MessageResponse(
                 content=msg.content,
                 ai_response=msg.ai_response
-            ) for msg in winning_attempt.messages
+            ) for msg in session.winning_attempt.messages
         ]
-            
-    session.status = SessionStatus.COMPLETED
-    db.commit()
     
-    return SessionResponse(
-        id=session.id,
-        start_time=session.start_time,
-        end_time=session.end_time,
-        entry_fee=session.entry_fee,
-        total_pot=session.total_pot,
-        status=session.status,
-        attempts=[{
-            'id': attempt.id,
-            'score': attempt.score,
-            'earnings': attempt.earnings,
-            'is_free_attempt': attempt.is_free_attempt
-        } for attempt in attempts],
-        winning_conversation=winning_conversation,
-        winning_attempt_was_free=session.winning_attempt.is_free_attempt if session.winning_attempt_id else None
-    )
+    return session_response(session, [{
+        'id': attempt.id,
+        'score': attempt.score,
+        'earnings': attempt.earnings,
+        'is_free_attempt': attempt.is_free_attempt
+    } for attempt in attempts], winning_conversation)
 
 # Game Attempts
 @app.post("/attempts/create", response_model=AttemptResponse)
-async def create_attempt(
+def create_attempt(
     request: CreateAttemptRequest,
     credentials: Optional[WorldIDCredentials] = Depends(verify_world_id_credentials),
     db: Session = Depends(get_db)
@@ -442,7 +442,7 @@ async def create_attempt(
         raise HTTPException(status_code=400, detail="No active session")
     
     # Get user by wldd_id
-    user = db.query(DBUser).filter(DBUser.wldd_id == wldd_id).first()
+    user = db.get(DBUser, wldd_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -460,10 +460,10 @@ async def create_attempt(
             is_free_attempt=True
         )
         db.add(new_attempt)
-        db.commit()
-        db.refresh(new_attempt)
+        db.flush()
         
-        return AttemptResponse(
+        # Build the response before the commit expires the attempt and session
+        response = AttemptResponse(
             id=new_attempt.id,
             session_id=new_attempt.session_id,
             wldd_id=new_attempt.wldd_id,
@@ -474,6 +474,9 @@ async def create_attempt(
             earnings=None,
             is_free_attempt=True
         )
+        db.commit()
+        
+        return response
             
     # Regular paid attempt flow
     if credentials:
@@ -481,12 +484,8 @@ async def create_attempt(
             raise HTTPException(status_code=400, detail="Payment reference required")
             
         print(f"Looking for payment with reference: {request.payment_reference}")
-        payment1 = db.query(DBPayment).filter(
-            DBPayment.reference == request.payment_reference
-        ).first()
-        print(f"Payment info: {payment1.reference}, {payment1.wldd_id}, {payment1.status}, {payment1.consumed}, {payment1.amount_raw}")
         print(f"Required payment info: {request.payment_reference}, {wldd_id}, confirmed, false, {active_session.entry_fee_raw}")
-        payment = db.query(DBPayment).with_for_update().filter(
+        payment = db.query(DBPayment).filter(
             DBPayment.reference == request.payment_reference,
             DBPayment.wldd_id == wldd_id,
             DBPayment.status == "confirmed",
@@ -519,31 +518,37 @@ async def create_attempt(
     )
     
     db.add(new_attempt)
-    active_session.total_pot += active_session.entry_fee
+    # The pot is bumped in SQL so concurrent entries can't lose an increment;
+    # the response reports the pot the UPDATE returned
+    total_pot_raw = DBSession.add_entry_fee_to_pot(db, active_session.id)
+    # Sets the column defaults (messages_remaining etc.) on the instance
+    db.flush()
     
     if credentials or not is_dev_mode:
-        # Mark payment as consumed
-        payment.consumed = True
-        payment.consumed_at = datetime.now(UTC)
-        payment.consumed_by_attempt_id = new_attempt.id
-    
-    db.commit()
-    db.refresh(new_attempt)
-    
-    return AttemptResponse(
+        # Mark payment as consumed; the conditional UPDATE means only one
+        # request can win a given payment, without locking it on read
+        if not DBPayment.try_consume(db, payment.id, new_attempt.id):
+            db.rollback()
+            raise HTTPException(status_code=400, detail="Payment has already been used")
+    
+    # Build the response before the commit expires the attempt and session
+    response = AttemptResponse(
         id=new_attempt.id,
         session_id=new_attempt.session_id,
         wldd_id=new_attempt.wldd_id,
         messages=[],
         score=None,
         messages_remaining=new_attempt.messages_remaining,
-        total_pot=active_session.total_pot,
+        total_pot=_to_usdc(total_pot_raw),
         earnings=None,
         is_free_attempt=False
     )
+    db.commit()
+    
+    return response
 
 @app.get("/attempts/{attempt_id}", response_model=AttemptResponse)
-async def get_attempt(
+def get_attempt(
     attempt_id: UUID,
     credentials: Optional[WorldIDCredentials] = Depends(verify_world_id_credentials),
     db: Session = Depends(get_db)
@@ -552,7 +557,9 @@ async def get_attempt(
         raise HTTPException(status_code=401, detail="World ID verification required")
     
     wldd_id = credentials.nullifier_hash
-    attempt = db.query(DBAttempt).filter(DBAttempt.id == attempt_id).first()
+    attempt = db.query(DBAttempt).options(
+        selectinload(DBAttempt.messages)
+    ).filter(DBAttempt.id == attempt_id).first()
     if not attempt:
         raise HTTPException(status_code=404, detail="Attempt not found")
     
@@ -588,7 +595,9 @@ async def score_attempt(
         raise HTTPException(status_code=401, detail="World ID verification required")
     
     wldd_id = credentials.nullifier_hash
-    attempt = db.query(DBAttempt).filter(DBAttempt.id == attempt_id).first()
+    attempt = db.query(DBAttempt).options(
+        selectinload(DBAttempt.messages)
+    ).filter(DBAttempt.id == attempt_id).first()
     if not attempt:
         raise HTTPException(status_code=404, detail="Attempt not found")
     
@@ -603,18 +612,21 @@ async def score_attempt(
     )
     attempt.score = score
     attempt.cost_to_run += cost
+    # The commit expires the loaded messages, and reloading them would raise
+    messages = [
+        MessageResponse(
+            content=msg.content,
+            ai_response=msg.ai_response
+        ) for msg in attempt.messages
+    ]
     db.commit()
+    invalidate_session_details_cache(attempt.session_id)
     
     return AttemptResponse(
         id=attempt.id,
         session_id=attempt.session_id,
         wldd_id=attempt.wldd_id,
-        messages=[
-            MessageResponse(
-                content=msg.content,
-                ai_response=msg.ai_response
-            ) for msg in attempt.messages
-        ],
+        messages=messages,
         score=attempt.score,
         messages_remaining=attempt.messages_remaining,
         total_pot=attempt.total_pot,
@@ -633,7 +645,7 @@ async def submit_message(
     if not credentials:
         raise HTTPException(status_code=401, detail="World ID verification required")
 
-    attempt = db.query(DBAttempt).filter(DBAttempt.id == attempt_id).first()
+    attempt = db.get(DBAttempt, attempt_id)
     if not attempt:
         raise HTTPException(status_code=404, detail="Attempt not found")
         
@@ -668,7 +680,7 @@ async def submit_message(
         raise HTTPException(status_code=503, detail=str(e))
 
 @app.post("/users/create", response_model=UserResponse)
-async def create_user(
+def create_user(
     request: CreateUserRequest, 
     credentials: Optional[WorldIDCredentials] = Depends(verify_world_id_credentials),
     db: Session = Depends(get_db)
@@ -694,10 +706,11 @@ async def create_user(
             detail="User with this WLDD ID already exists"
         )
     
+    now = datetime.now(UTC)
     new_user = DBUser(
         wldd_id=request.wldd_id,
-        created_at=datetime.now(UTC),
-        last_active=datetime.now(UTC),
+        created_at=now,
+        last_active=now,
         language=request.language
     )
     
@@ -707,52 +720,61 @@ async def create_user(
     
     return UserResponse(
         wldd_id=new_user.wldd_id,
-        stats=new_user.get_stats(),
+        stats=new_user.get_stats(db),
         language=new_user.language
     )
 
 @app.get("/userinfo/{wldd_id}", response_model=UserResponse)
-async def get_user(wldd_id: str, db: Session = Depends(get_db)):
+def get_user(wldd_id: str, db: Session = Depends(get_db)):
     """Get user details by WLDD ID"""
-    user = db.query(DBUser).filter(DBUser.wldd_id == wldd_id).first()
+    user = db.get(DBUser, wldd_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
     return UserResponse(
         wldd_id=user.wldd_id,
-        stats=user.get_stats(),
+        stats=user.get_stats(db),
         language=user.language
     )
 
 @app.get("/userinfo/{wldd_id}/stats")
-async def get_user_stats(wldd_id: str, db: Session = Depends(get_db)):
+def get_user_stats(wldd_id: str, db: Session = Depends(get_db)):
     """Get detailed user statistics"""
-    user = db.query(DBUser).filter(DBUser.wldd_id == wldd_id).first()
+    user = db.get(DBUser, wldd_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    # Get all user's attempts
-    attempts = db.query(DBAttempt).filter(DBAttempt.wldd_id == wldd_id).all()
-    
-    # Count total messages using a subquery for efficiency
-    total_messages = db.query(DBMessage)\
-        .join(DBAttempt)\
+    # Games and earnings come from the user counters; the rest is one
+    # aggregate over the user's attempts (a score of 0 counts as unscored)
+    scored = DBAttempt.score_raw > 0
+    average_score_raw, best_score_raw, completed_sessions, total_messages = db.query(
+        func.avg(DBAttempt.score_raw).filter(scored),
+        func.max(DBAttempt.score_raw).filter(scored),
+        func.count(DBAttempt.session_id.distinct()).filter(
+            DBSession.status == SessionStatus.COMPLETED.value
+        ),
+        db.query(func.count(DBMessage.id))
+            .join(DBAttempt)
+            .filter(DBAttempt.wldd_id == wldd_id)
+            .scalar_subquery()
+    ).select_from(DBAttempt)\
+        .join(DBSession, DBAttempt.session_id == DBSession.id)\
         .filter(DBAttempt.wldd_id == wldd_id)\
-        .count()
+        .one()
     
     stats = {
-        "total_games": len(attempts),
-        "total_earnings": sum(a.earnings for a in attempts if a.earnings),
-        "average_score": sum(a.score for a in attempts if a.score) / len([a for a in attempts if a.score]) if attempts else 0,
+        "total_games": user.total_games,
+        "total_earnings": user.total_earnings,
+        "average_score": float(average_score_raw) / 1000 if average_score_raw else 0,
         "total_messages": total_messages,
-        "best_score": max((a.score for a in attempts if a.score), default=0),
-        "completed_sessions": len(set(a.session_id for a in attempts if a.session.status == SessionStatus.COMPLETED))
+        "best_score": best_score_raw / 1000 if best_score_raw else 0,
+        "completed_sessions": completed_sessions
     }
     
     return stats
 
 @app.get("/userinfo/{wldd_id}/attempts", response_model=List[AttemptResponse])
-async def get_user_attempts(
+def get_user_attempts(
     wldd_id: str, 
     limit: int = 10, 
     offset: int = 0,
@@ -760,6 +782,7 @@ async def get_user_attempts(
 ):
     """Get user's game attempts with pagination"""
     attempts = db.query(DBAttempt)\
+        .options(selectinload(DBAttempt.messages))\
         .filter(DBAttempt.wldd_id == wldd_id)\
         .order_by(DBAttempt.created_at.desc())\
         .offset(offset)\
@@ -784,7 +807,7 @@ async def get_user_attempts(
     ) for attempt in attempts]
 
 @app.post("/users/language", response_model=UserResponse)
-async def update_language(
+def update_language(
     request: UpdateLanguageRequest,
     credentials: Optional[WorldIDCredentials] = Depends(verify_world_id_credentials),
     db: Session = Depends(get_db)
@@ -809,7 +832,7 @@ async def update_language(
         db.commit()
         return UserResponse(
             wldd_id=user.wldd_id,
-            stats=user.get_stats(),
+            stats=user.get_stats(db),
             language=user.language
         )
     except Exception as e:
@@ -823,9 +846,11 @@ ADMIN_NULLIFIER_HASHES = os.getenv("ADMIN_NULLIFIER_HASHES", "").split(",")
 print(f"Loaded admin hashes: {ADMIN_NULLIFIER_HASHES}")  # Log on startup
 
 @app.get("/api/admin/unpaid_attempts")
-async def get_unpaid_attempts(db: Session = Depends(get_db)):
+def get_unpaid_attempts(db: Session = Depends(get_db)):
     """Get all unpaid attempts with earnings"""
-    attempts = db.query(DBAttempt).join(DBUser).filter(
+    attempts = db.query(DBAttempt).join(DBUser).options(
+        contains_eager(DBAttempt.user)
+    ).filter(
         DBAttempt.earnings_raw > 0,
         DBAttempt.paid == False,
         DBUser.wallet_address.isnot(None)
@@ -841,7 +866,7 @@ async def get_unpaid_attempts(db: Session = Depends(get_db)):
     } for attempt in attempts]
 
 @app.post("/api/admin/attempts/{attempt_id}/mark_paid")
-async def mark_attempt_paid(attempt_id: UUID, db: Session = Depends(get_db), credentials: Optional[WorldIDCredentials] = Depends(verify_world_id_credentials)):
+def mark_attempt_paid(attempt_id: UUID, db: Session = Depends(get_db), credentials: Optional[WorldIDCredentials] = Depends(verify_world_id_credentials)):
     """Mark an attempt as paid"""
     if not credentials:
         logger.error("No credentials provided to has_free_attempt")
@@ -852,7 +877,7 @@ async def mark_attempt_paid(attempt_id: UUID, db: Session = Depends(get_db), cre
     if wldd_id not in ADMIN_NULLIFIER_HASHES:
         raise HTTPException(status_code=403, detail="Unauthorized")
         
-    attempt = db.query(DBAttempt).filter(DBAttempt.id == attempt_id).first()
+    attempt = db.get(DBAttempt, attempt_id)
     if not attempt:
         raise HTTPException(status_code=404, detail="Attempt not found")
     
@@ -860,43 +885,8 @@ async def mark_attempt_paid(attempt_id: UUID, db: Session = Depends(get_db), cre
     db.commit()
     return {"success": True}
 
-@app.get("/sessions/stats")
-async def get_session_stats(db: Session = Depends(get_db)):
-    """Get global session statistics"""
-    sessions = db.query(DBSession).all()
-    
-    stats = {
-        "total_sessions": len(sessions),
-        "total_active_sessions": len([s for s in sessions if s.status == SessionStatus.ACTIVE]),
-        "total_completed_sessions": len([s for s in sessions if s.status == SessionStatus.COMPLETED]),
-        "total_pot_distributed": sum(s.total_pot for s in sessions if s.status == SessionStatus.COMPLETED),
-        "average_pot_size": sum(s.total_pot for s in sessions) / len(sessions) if sessions else 0,
-        "total_attempts": sum(len(s.attempts) for s in sessions),
-        "average_attempts_per_session": sum(len(s.attempts) for s in sessions) / len(sessions) if sessions else 0
-    }
-    
-    return stats
-
-@app.get("/sessions/{session_id}", response_model=SessionResponse)
-async def get_session(session_id: UUID, db: Session = Depends(get_db)):
-    """Get specific session details"""
-    session = db.query(DBSession).filter(DBSession.id == session_id).first()
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
-        
-    return SessionResponse(
-        id=session.id,
-        start_time=session.start_time,
-        end_time=session.end_time,
-        entry_fee=session.entry_fee,
-        total_pot=session.total_pot,
-        status=session.status,
-        attempts=[{
-            'id': attempt.id,
-            'score': attempt.score,
-            'earnings': attempt.earnings
-        } for attempt in session.attempts if attempt.score is not None]
-    )
+# Most judge calls verify_session keeps in flight at once
+VERIFY_SCORING_CONCURRENCY = 8
 
 @app.put("/sessions/{session_id}/verify")
 async def verify_session(
@@ -905,17 +895,27 @@ async def verify_session(
     llm_service: LLMService = Depends(get_llm_service)
 ):
     """Verify session results and recalculate scores if needed"""
-    session = db.query(DBSession).filter(DBSession.id == session_id).first()
+    session = db.query(DBSession).options(
+        selectinload(DBSession.attempts).selectinload(DBAttempt.messages)
+    ).filter(DBSession.id == session_id).first()
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    # Recalculate scores for all attempts
-    for attempt in session.attempts:
-        score, cost = await llm_service.score_conversation(attempt.messages)
+    # Recalculate scores for all attempts; the attempts are independent, so
+    # the judge calls run concurrently (bounded to stay under rate limits)
+    limit = asyncio.Semaphore(VERIFY_SCORING_CONCURRENCY)
+    
+    async def rescore(attempt):
+        async with limit:
+            return await llm_service.score_conversation(attempt.messages)
+    
+    results = await asyncio.gather(*(rescore(attempt) for attempt in session.attempts))
+    for attempt, (score, cost) in zip(session.attempts, results):
         attempt.score = score
         attempt.cost_to_run += cost
     
     db.commit()
+    invalidate_session_details_cache(session_id)
     
     return {"message": "Session verified", "session_id": session_id}
 
@@ -926,7 +926,9 @@ async def force_score_attempt(
     llm_service: LLMService = Depends(get_llm_service)
 ):
     """Force scoring of an attempt (admin endpoint)"""
-    attempt = db.query(DBAttempt).filter(DBAttempt.id == attempt_id).first()
+    attempt = db.query(DBAttempt).options(
+        selectinload(DBAttempt.messages)
+    ).filter(DBAttempt.id == attempt_id).first()
     if not attempt:
         raise HTTPException(status_code=404, detail="Attempt not found")
     
@@ -939,12 +941,13 @@ async def force_score_attempt(
         attempt.score = score
         attempt.cost_to_run += cost
         db.commit()
+        invalidate_session_details_cache(attempt.session_id)
         return {"attempt_id": attempt_id, "score": score}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Scoring failed: {str(e)}")
 
 @app.get("/admin/attempts")
-async def get_all_attempts(
+def get_all_attempts(
     request: Request,
     page: int = 1,
     page_size: int = 20,
@@ -953,7 +956,7 @@ async def get_all_attempts(
 ):
     """Get all attempts with pagination and filtering for admin panel"""
     # Verify admin access
-    credentials = await verify_world_id_credentials(request, db)
+    credentials = verify_world_id_credentials(request, db)
     if credentials.nullifier_hash not in ADMIN_NULLIFIER_HASHES:
         raise HTTPException(status_code=403, detail="Not authorized")
     
@@ -966,9 +969,9 @@ async def get_all_attempts(
             query = query.filter(DBAttempt.messages_remaining > 0)
             
         if filters.score_min is not None:
-            query = query.filter(DBAttempt.score >= filters.score_min)
+            query = query.filter(DBAttempt.score_raw >= round(filters.score_min * 1000))
         if filters.score_max is not None:
-            query = query.filter(DBAttempt.score <= filters.score_max)
+            query = query.filter(DBAttempt.score_raw <= round(filters.score_max * 1000))
             
         if filters.date_from:
             query = query.filter(DBAttempt.created_at >= filters.date_from)
@@ -985,13 +988,8 @@ async def get_all_attempts(
     query = query.order_by(DBAttempt.created_at.desc())
     query = query.offset((page - 1) * page_size).limit(page_size)
     
-    attempts = query.all()
-    
-    # Load messages for each attempt
-    for attempt in attempts:
-        attempt.messages = db.query(DBMessage).filter(
-            DBMessage.attempt_id == attempt.id
-        ).order_by(DBMessage.id).all()
+    # Load messages for all attempts on the page in one extra query
+    attempts = query.options(selectinload(DBAttempt.messages)).all()
     
     return {
         "attempts": attempts,
@@ -1024,10 +1022,11 @@ async def verify_world_id(request: VerifyRequest, db: Session = Depends(get_db))
         if existing_verification:
             # If user doesn't exist but has verification, create user
             if not user:
+                now = datetime.now(UTC)
                 user = DBUser(
                     wldd_id=request.nullifier_hash,
-                    created_at=datetime.now(UTC),
-                    last_active=datetime.now(UTC),
+                    created_at=now,
+                    last_active=now,
                     name=request.name,
                     language=request.language.lower()
                 )
@@ -1092,11 +1091,12 @@ async def verify_world_id(request: VerifyRequest, db: Session = Depends(get_db))
             verify_response = response.json()
             
             # Store new verification
+            now = datetime.now(UTC)
             verification = DBVerification(
                 nullifier_hash=request.nullifier_hash,
                 merkle_root=request.merkle_root,
                 action=request.action,
-                created_at=datetime.now(UTC)
+                created_at=now
             )
             
             db.add(verification)
@@ -1110,8 +1110,8 @@ async def verify_world_id(request: VerifyRequest, db: Session = Depends(get_db))
             if not user:
                 user = DBUser(
                     wldd_id=request.nullifier_hash,
-                    created_at=datetime.now(UTC),
-                    last_active=datetime.now(UTC),
+                    created_at=now,
+                    last_active=now,
                     name=request.name,
                     language=request.language.lower()
                 )
@@ -1156,7 +1156,7 @@ async def health_check():
     }
 
 @app.get("/status")
-async def system_status(db: Session = Depends(get_db)):
+def system_status(db: Session = Depends(get_db)):
     """Detailed system status"""
     try:
         # Test DB connection
@@ -1183,7 +1183,7 @@ async def system_status(db: Session = Depends(get_db)):
     }
 
 @app.post("/payments/initiate", response_model=PaymentInitResponse)
-async def initiate_payment(
+def initiate_payment(
     credentials: Optional[WorldIDCredentials] = Depends(verify_world_id_credentials),
     db: Session = Depends(get_db)
 ):
@@ -1195,7 +1195,7 @@ async def initiate_payment(
 
     # Get user from credentials
     wldd_id = credentials.nullifier_hash
-    user = db.query(DBUser).filter(DBUser.wldd_id == wldd_id).first()
+    user = db.get(DBUser, wldd_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -1304,7 +1304,7 @@ async def confirm_payment(request: PaymentConfirmRequest, db: Session = Depends(
         return {"success": False, "error": str(e)}
 
 @app.post("/api/payments/{reference}/confirm")
-async def admin_confirm_payment(
+def admin_confirm_payment(
     reference: str,
     payload: dict,
     credentials: Optional[WorldIDCredentials] = Depends(verify_world_id_credentials),
@@ -1341,43 +1341,46 @@ async def admin_confirm_payment(
 # Create scheduler
 scheduler = AsyncIOScheduler()
 
-async def check_and_end_sessions():
+def check_and_end_sessions():
     """Check for expired sessions and end them, start new ones if needed"""
-    db = next(get_db())
-    try:
-        # First check for expired sessions
-        expired_session = db.query(DBSession).filter(
-            DBSession.status == SessionStatus.ACTIVE.value,
-            DBSession.end_time <= datetime.now(UTC)
-        ).first()
-        
-        if expired_session:
-            print(f"Found expired session {expired_session.id}, ending it...")
-            await admin_end_session(
-                session_id=expired_session.id,
-                api_key=os.getenv("ADMIN_API_KEY"),
-                db=db
-            )
-        
-        # Then check if we need to start a new session
-        active_session = db.query(DBSession).filter(
-            DBSession.status == SessionStatus.ACTIVE.value
-        ).first()
-        
-        if not active_session:
-            print("No active session found, creating new one...")
-            await admin_create_session(
-                entry_fee=0.1,  # Default to 0.1 WLDD
-                duration_hours=24,
-                api_key=os.getenv("ADMIN_API_KEY"),
-                db=db
-            )
-            print("New session created")
+    # A plain function: AsyncIOScheduler runs it on its thread pool, so none
+    # of these queries block the event loop
+    with SessionLocal() as db:
+        try:
+            # First check for expired sessions
+            expired_session = db.query(DBSession).filter(
+                DBSession.status == SessionStatus.ACTIVE.value,
+                DBSession.end_time <= datetime.now(UTC)
+            ).first()
             
-    except Exception as e:
-        print(f"Error in session checker: {str(e)}")
-    finally:
-        db.close()
+            if expired_session:
+                print(f"Found expired session {expired_session.id}, ending it...")
+                admin_end_session(
+                    session_id=expired_session.id,
+                    api_key=os.getenv("ADMIN_API_KEY"),
+                    db=db
+                )
+                invalidate_current_session_cache()
+            
+            # Then check if we need to start a new session
+            active_exists = db.query(
+                db.query(DBSession.id).filter(
+                    DBSession.status == SessionStatus.ACTIVE.value
+                ).exists()
+            ).scalar()
+            
+            if not active_exists:
+                print("No active session found, creating new one...")
+                create_active_session(
+                    db,
+                    entry_fee=0.1,  # Default to 0.1 WLDD
+                    duration_hours=24
+                )
+                invalidate_current_session_cache()
+                print("New session created")
+                
+        except Exception as e:
+            print(f"Error in session checker: {str(e)}")
 
 # Start scheduler when app starts
 @app.on_event("startup")
@@ -1393,13 +1396,17 @@ async def start_scheduler():
 async def startup_event():
     logger.info("Starting Bungo API server")
     logger.info(f"Environment: {os.getenv('ENVIRONMENT', 'development')}")
+    # Warm up per worker so the first request doesn't pay for mapper
+    # configuration and OpenAPI schema generation
+    configure_mappers()
+    app.openapi()
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Shutting down Bungo API server")
 
 @app.get("/sessions/active/attempts", response_model=List[AttemptResponse])
-async def get_active_session_attempts(
+def get_active_session_attempts(
     credentials: Optional[WorldIDCredentials] = Depends(verify_world_id_credentials),
     limit: int = 10, 
     offset: int = 0,
@@ -1427,11 +1434,12 @@ async def get_active_session_attempts(
     
     # Get attempts for this session AND this user
     attempts = db.query(DBAttempt)\
+        .options(selectinload(DBAttempt.messages))\
         .filter(
             DBAttempt.session_id == active_session.id,
             DBAttempt.wldd_id == wldd_id  # Add user filter
         )\
-        .order_by(DBAttempt.score.desc())\
+        .order_by(DBAttempt.score_raw.desc())\
         .offset(offset)\
         .limit(limit)\
         .all()
@@ -1454,7 +1462,7 @@ async def get_active_session_attempts(
     ) for attempt in attempts]
 
 @app.get("/session/{session_id}/leaderboard/{attempt_type}")
-async def get_session_leaderboard(session_id: str, attempt_type: str, db: Session = Depends(get_db)):
+def get_session_leaderboard(session_id: str, attempt_type: str, db: Session = Depends(get_db)):
     """Get top 10 attempts for a specific session and attempt type (free or paid)"""
     if attempt_type not in ["free", "paid"]:
         raise HTTPException(status_code=400, detail="attempt_type must be either 'free' or 'paid'")
@@ -1466,10 +1474,10 @@ async def get_session_leaderboard(session_id: str, attempt_type: str, db: Sessio
         DBUser, DBAttempt.wldd_id == DBUser.wldd_id
     ).filter(
         DBAttempt.session_id == session_id,
-        DBAttempt.score.isnot(None),  # Only include attempts with scores
+        DBAttempt.score_raw.isnot(None),  # Only include attempts with scores
         DBAttempt.is_free_attempt == (attempt_type == "free")  # Filter by attempt type
     ).order_by(
-        DBAttempt.score.desc()
+        DBAttempt.score_raw.desc()
     ).limit(8).all()
     
     return [{"name": name, "score": float(score)} for score, name in top_attempts]
\ No newline at end of file
@@ -4,7 +4,7 @@ from datetime import datetime
 from src.models.game import Message
 from src.services.llm_service import LLMService
 from src.models.database_models import DBMessage, DBAttempt, DBUser
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from sqlalchemy import select
 from uuid import UUID
 from zoneinfo import ZoneInfo
@@ -19,7 +19,9 @@ class ConversationManager:
         
     async def process_attempt_message(self, attempt_id: UUID, message_content: str, user_name: Optional[str] = None) -> DBMessage:
         # First check attempt exists and has messages remaining without a lock
-        attempt = self.db.query(DBAttempt).filter(
+        attempt = self.db.query(DBAttempt).options(
+            selectinload(DBAttempt.messages)
+        ).filter(
             DBAttempt.id == attempt_id
         ).first()
         
@@ -62,15 +64,11 @@ class ConversationManager:
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"LLM service error: {str(e)}")
 
-        # Now do the database updates with minimal lock time
+        # Now do the database updates without holding a row lock
         try:
-            # Lock the row only for the update
-            attempt = self.db.query(DBAttempt).with_for_update().filter(
-                DBAttempt.id == attempt_id
-            ).first()
-            
-            # Double check messages remaining in case it changed
-            if attempt.messages_remaining <= 0:
+            # Double check messages remaining in case it changed: the
+            # conditional UPDATE only succeeds if one is still left
+            if not DBAttempt.try_use_message(self.db, attempt_id, cost):
                 raise HTTPException(status_code=400, detail="No messages remaining")
             
             new_message = DBMessage(
@@ -80,13 +78,13 @@ class ConversationManager:
                 timestamp=datetime.now(UTC)
             )
             
-            attempt.messages_remaining -= 1
-            attempt.cost_to_run += cost
-            
             self.db.add(new_message)
             self.db.commit()
             return new_message
             
+        except HTTPException:
+            self.db.rollback()
+            raise
         except Exception as e:
             self.db.rollback()
             raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
\ No newline at end of file
@@ -1,7 +1,6 @@
 # src/services/llm.py
 
 import os
-from datetime import datetime
 from uuid import uuid4
 import yaml
 
@@ -62,7 +61,7 @@ def run_conversation():
             break
         
         user_messages_count += 1
-        user_msg = Message(content=user_input, timestamp=datetime.utcnow())
+        user_msg = Message(content=user_input)
         attempt.messages.append(user_msg)
         
         # Add user message to conversation payload
@@ -77,7 +76,7 @@ def run_conversation():
             print("LLM API call failed:", e)
             break
         
-        ai_msg = Message(content=ai_response, timestamp=datetime.utcnow())
+        ai_msg = Message(content=ai_response)
         attempt.messages.append(ai_msg)
         conversation_payload.append({"role": "assistant", "content": ai_response})
         
@@ -0,0 +1,262 @@
+# test_stats.py
+import os
+import shutil
+import tempfile
+import orjson
+
+# Point the app at a throwaway SQLite database before src.database reads it
+_db_dir = tempfile.mkdtemp()
+_db_path = os.path.join(_db_dir, "test_stats.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_path}"
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from src.database import Base, engine, SessionLocal
+from src.models.database_models import DBSession, DBAttempt, DBUser
+from src.models.game import SessionStatus
+from src.routes.admin import admin_end_session, create_active_session
+from src.routes.api import app, end_session
+
+UTC = ZoneInfo("UTC")
+
+# src.database builds its engine once per process: if something imported it
+# before this module, the engine points at a real database that
+# reset_database() would wipe, so refuse to touch it
+if engine.url.database != _db_path:
+    shutil.rmtree(_db_dir, ignore_errors=True)
+    raise RuntimeError(f"test_stats needs its own database, but src.database is bound to {engine.url!r}")
+
+Base.metadata.create_all(engine)
+
+def teardown_module():
+    engine.dispose()
+    shutil.rmtree(_db_dir, ignore_errors=True)
+
+def reset_database():
+    # sessions and attempts reference each other, so clear rows instead of
+    # dropping tables; SQLite doesn't enforce the foreign keys by default
+    with engine.begin() as conn:
+        for table in Base.metadata.tables.values():
+            conn.execute(table.delete())
+
+def make_session(db, status=SessionStatus.COMPLETED.value, total_pot=0):
+    now = datetime.now(UTC)
+    session = DBSession(
+        start_time=now - timedelta(hours=1),
+        end_time=now,
+        entry_fee=1.0,
+        total_pot=total_pot,
+        status=status
+    )
+    db.add(session)
+    db.flush()
+    return session
+
+def make_users(db, *wldd_ids):
+    now = datetime.now(UTC)
+    db.add_all([DBUser(wldd_id=w, name=w, created_at=now, last_active=now) for w in wldd_ids])
+    db.flush()
+
+def user_counters(db, wldd_id):
+    user = db.get(DBUser, wldd_id)
+    db.refresh(user)
+    return user.total_games, user.total_wins, user.total_earnings_raw
+
+def baseline_earnings_raw(attempts, pot):
+    """The payout rules as the original per-attempt Python loop applied them.
+
+    attempts is a list of (score, is_free_attempt); returns earnings_raw
+    for each, in the same order.
+    """
+    earnings = [0.0] * len(attempts)
+    paid = [i for i, (score, free) in enumerate(attempts) if score is not None and not free]
+    total_score = sum(attempts[i][0] for i in paid)
+    if total_score > 0:
+        low_score_earnings = 0
+        qualifying_score_total = 0
+        qualifying = []
+        for i in paid:
+            score = attempts[i][0]
+            share = (score / total_score) * pot
+            if share < 0.1:
+                continue
+            elif score <= 4:
+                low_score_earnings += share
+            else:
+                qualifying.append(i)
+                qualifying_score_total += score
+        redistribution_amount = low_score_earnings * 0.5
+        for i in qualifying:
+            score = attempts[i][0]
+            base_share = (score / total_score) * pot
+            bonus_share = (score / qualifying_score_total) * redistribution_amount
+            earnings[i] = base_share + bonus_share
+    # DBAttempt.earnings' setter stored int(value * 1_000_000)
+    return [int(e * 1_000_000) for e in earnings]
+
+def test_counters_follow_inserts_and_rescores():
+    reset_database()
+    with SessionLocal() as db:
+        make_users(db, "alice", "bob")
+        session = make_session(db)
+        first = DBAttempt(session_id=session.id, wldd_id="alice", score=8.0, earnings=1.5)
+        second = DBAttempt(session_id=session.id, wldd_id="alice", score=3.0)
+        third = DBAttempt(session_id=session.id, wldd_id="bob", score=6.0, earnings=0.25)
+        db.add_all([first, second, third])
+        db.commit()
+
+        assert user_counters(db, "alice") == (2, 1, 1_500_000)
+        assert user_counters(db, "bob") == (1, 0, 250_000)
+
+        # Rescoring moves the win and the earnings between attempts
+        first.score = 5.0
+        first.earnings = 0
+        second.score = 9.0
+        second.earnings = 2.0
+        third.score = 7.5
+        db.commit()
+
+        assert user_counters(db, "alice") == (2, 1, 2_000_000)
+        assert user_counters(db, "bob") == (1, 1, 250_000)
+
+        # Moving an attempt to another user recounts both
+        third.wldd_id = "alice"
+        db.commit()
+
+        assert user_counters(db, "alice") == (3, 2, 2_250_000)
+        assert user_counters(db, "bob") == (0, 0, 0)
+
+def test_only_one_active_session():
+    reset_database()
+    with SessionLocal() as db:
+        first = create_active_session(db, entry_fee=0.1, duration_hours=1)
+        assert first.status == SessionStatus.ACTIVE.value
+
+        try:
+            create_active_session(db, entry_fee=0.1, duration_hours=1)
+        except HTTPException as e:
+            assert e.status_code == 400
+        else:
+            raise AssertionError("a second active session was created")
+
+        active = db.query(DBSession).filter(DBSession.status == SessionStatus.ACTIVE.value).all()
+        assert [s.id for s in active] == [first.id]
+
+def test_end_session_payouts_match_baseline():
+    reset_database()
+    pot = 3.0
+    attempts = [(8.0, False), (5.0, False), (3.0, False), (9.5, True), (None, False)]
+    with SessionLocal() as db:
+        make_users(db, "u0", "u1", "u2")
+        session = make_session(db, status=SessionStatus.ACTIVE.value, total_pot=pot)
+        rows = []
+        for i, (score, free) in enumerate(attempts):
+            rows.append(DBAttempt(
+                session_id=session.id,
+                wldd_id=f"u{i % 3}",
+                score=score,
+                is_free_attempt=free
+            ))
+        db.add_all(rows)
+        db.commit()
+        session_id = session.id
+        attempt_ids = [a.id for a in rows]
+
+    with SessionLocal() as db:
+        result = orjson.loads(admin_end_session(session_id=session_id, api_key=None, db=db).body)
+        # The free 9.5 is the top score and wins the conversation, unpaid
+        assert result["winning_attempt_id"] == str(attempt_ids[3])
+        assert result["winning_attempt_was_free"] is True
+
+    expected = baseline_earnings_raw(attempts, pot)
+    with SessionLocal() as db:
+        earnings = [db.get(DBAttempt, attempt_id).earnings_raw or 0 for attempt_id in attempt_ids]
+        # Postgres rounds the final cast to BIGINT where the old setter
+        # truncated, so allow one micro-unit either way
+        assert all(abs(got - want) <= 1 for got, want in zip(earnings, expected)), (earnings, expected)
+        assert earnings[2:] == [0, 0, 0]
+
+        # Counters were recounted for every user the payout touched
+        for wldd_id in ("u0", "u1", "u2"):
+            owned = [e for a, e in zip(rows, earnings) if a.wldd_id == wldd_id]
+            assert user_counters(db, wldd_id)[2] == sum(owned)
+
+    # Ending it again is rejected and leaves the payouts alone
+    with SessionLocal() as db:
+        try:
+            admin_end_session(session_id=session_id, api_key=None, db=db)
+        except HTTPException as e:
+            assert e.status_code == 400
+        else:
+            raise AssertionError("an ended session was ended again")
+        assert [db.get(DBAttempt, attempt_id).earnings_raw or 0 for attempt_id in attempt_ids] == earnings
+
+def test_put_end_session_settles_once():
+    reset_database()
+    with SessionLocal() as db:
+        make_users(db, "u0", "u1")
+        session = make_session(db, status=SessionStatus.ACTIVE.value, total_pot=2.0)
+        rows = [
+            DBAttempt(session_id=session.id, wldd_id="u0", score=9.0),
+            DBAttempt(session_id=session.id, wldd_id="u1", score=9.0)
+        ]
+        db.add_all(rows)
+        db.commit()
+        session_id = session.id
+
+    with SessionLocal() as db:
+        ended = end_session(session_id=session_id, db=db)
+        assert ended.status == SessionStatus.COMPLETED.value
+        winning_attempt_id = db.get(DBSession, session_id).winning_attempt_id
+        earnings = sorted((a["id"], a["earnings"]) for a in ended.attempts)
+
+    # A second call (double click, the admin endpoint, the scheduler) must not
+    # redraw the tied winner or rewrite the payouts
+    for end in (end_session, lambda session_id, db: admin_end_session(session_id=session_id, api_key=None, db=db)):
+        with SessionLocal() as db:
+            try:
+                end(session_id=session_id, db=db)
+            except HTTPException as e:
+                assert e.status_code == 400
+            else:
+                raise AssertionError("an ended session was ended again")
+    with SessionLocal() as db:
+        assert db.get(DBSession, session_id).winning_attempt_id == winning_attempt_id
+        attempts = db.query(DBAttempt).filter(DBAttempt.session_id == session_id)
+        assert sorted((a.id, a.earnings) for a in attempts) == earnings
+
+def test_session_stats_route():
+    reset_database()
+    with SessionLocal() as db:
+        make_users(db, "u0")
+        done = make_session(db, total_pot=3.0)
+        make_session(db, status=SessionStatus.ACTIVE.value, total_pot=1.0)
+        db.add_all([DBAttempt(session_id=done.id, wldd_id="u0", score=s) for s in (4.0, 7.0, None)])
+        db.commit()
+
+    # Through the router, so /sessions/{session_id} can't shadow it
+    response = TestClient(app).get("/sessions/stats")
+    assert response.status_code == 200, response.text
+    assert response.json() == {
+        "total_sessions": 2,
+        "total_active_sessions": 1,
+        "total_completed_sessions": 1,
+        "total_pot_distributed": 3.0,
+        "average_pot_size": 2.0,
+        "total_attempts": 3,
+        "average_attempts_per_session": 1.5
+    }
+
+if __name__ == "__main__":
+    try:
+        test_counters_follow_inserts_and_rescores()
+        test_only_one_active_session()
+        test_end_session_payouts_match_baseline()
+        test_put_end_session_settles_once()
+        test_session_stats_route()
+    finally:
+        teardown_module()
+    print("All stats tests passed")